@@ -0,0 +1,145 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Streaming and checkpointed writer for crawled article.
+"""
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+
+class ArticleWriter:
+    """Append article record to JSONL file as soon as it is crawled.
+        Urls already in file are regarded as completed, so file itself works as checkpoint of restarted crawl.
+
+    Args:
+        fpath (str): JSONL path to append records
+        flush_every (int): number of records between flush to disk
+    Return:
+    """
+    def __init__(self, fpath, flush_every=10):
+        self.fpath = fpath
+        self.flush_every = flush_every
+        self.completed = self.load_completed()
+
+        self.file = open(fpath, 'a', encoding='utf-8')
+        self.n_pending = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def load_completed(self):
+        """Read urls of completed records. Partial line written by crashed run is truncated.
+
+        Args:
+        Return:
+            completed (set): set of completed urls
+        """
+        completed = set()
+        if not os.path.exists(self.fpath):
+            return completed
+
+        with open(self.fpath, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+                data = data[:data.rfind(b'\n') + 1]
+
+        for line in data.decode('utf-8').splitlines():
+            if line.strip():
+                completed.add(json.loads(line)['url'])
+        return completed
+
+    def write(self, url, article):
+        """Append one article record.
+
+        Args:
+            url (str): url of article. used as checkpoint key
+            article (dict): column-value dictionary
+        Return:
+        """
+        record = {'url': url}
+        for column, value in article.items():
+            record[column] = None if isinstance(value, float) and value != value else value
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+
+        with self.lock:
+            self.file.write(line)
+            self.completed.add(url)
+            self.n_pending += 1
+            if self.n_pending >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.n_pending = 0
+
+    def flush(self):
+        """Flush pending records to disk.
+
+        Args:
+        Return:
+        """
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        """Flush and close file.
+
+        Args:
+        Return:
+        """
+        with self.lock:
+            if not self.file.closed:
+                self._flush()
+                self.file.close()
+
+    def export_csv(self, urls, save_fpath, columns, chunksize=1000):
+        """Export records to CSV in the order of $urls. Record crawled later wins for the same url.
+            Only byte offset of each record is kept in memory, and records are read back by seeking and written in chunks.
+
+        Args:
+            urls (list): url order of output rows. url not yet crawled is skipped
+            save_fpath (str): CSV path to save
+            columns (list): columns of output
+            chunksize (int): number of rows written at once
+        Return:
+        """
+        self.flush()
+
+        offsets = dict()
+        with open(self.fpath, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    offsets[json.loads(line)['url']] = offset
+                offset += len(line)
+
+        with open(self.fpath, 'rb') as f:
+            rows = list()
+            header = True
+            for url in urls:
+                if url not in offsets:
+                    continue
+                f.seek(offsets[url])
+                rows.append(json.loads(f.readline()))
+                if len(rows) >= chunksize:
+                    self._write_rows(rows, save_fpath, columns, header)
+                    rows, header = list(), False
+            if rows or header:
+                self._write_rows(rows, save_fpath, columns, header)
+
+    @staticmethod
+    def _write_rows(rows, save_fpath, columns, header):
+        # object dtype so that formatting of value does not depend on other rows of chunk
+        df = pd.DataFrame(rows, columns=columns, dtype=object)
+        df.to_csv(save_fpath, encoding='utf-8', index=False, mode='w' if header else 'a', header=header)
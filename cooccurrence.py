@@ -0,0 +1,176 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Sparse co-occurrence of keywords and nouns with PMI/NPMI weighting.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from corpus import TokenCorpus
+
+
+class CooccurrenceEngine:
+    """Co-occurrence from sparse document-term matrix. Document co-occurrence is X^T X,
+        window co-occurrence counts token pairs within window in each document.
+
+    Args:
+        docs (list or TokenCorpus): list of tokens per document, or corpus of token ids
+    Return:
+    """
+    def __init__(self, docs):
+        corpus = docs if isinstance(docs, TokenCorpus) else TokenCorpus.from_docs(docs)
+        self.vocabulary = corpus.vocabulary
+        self.terms = corpus.terms
+
+        # token ids of every document concatenated, document boundary at indptr
+        self.ids = np.asarray(corpus.ids)
+        self.indptr = np.asarray(corpus.indptr)
+        self.n_docs = len(corpus)
+
+        data = np.ones(len(self.ids), dtype=np.int32)
+        self.counts = sparse.csr_matrix((data, self.ids.copy(), self.indptr.copy()), shape=(self.n_docs, len(self.terms)))
+        self.counts.sum_duplicates()
+
+    def _term_ids(self, terms):
+        if terms is None:
+            return self.terms, np.arange(len(self.terms))
+        terms = list(terms)
+        return terms, np.array([self.vocabulary.get(term, -1) for term in terms])
+
+    def doc_term_matrix(self, terms=None, binary=True):
+        """Document-term matrix restricted to $terms. Term not in documents has empty column.
+
+        Args:
+            terms (list): terms of columns. all terms if None
+            binary (bool): whether to mark presence instead of count
+        Return:
+            matrix (scipy csr_matrix): n_docs x len(terms)
+            terms (list): terms of columns
+        """
+        terms, ids = self._term_ids(terms)
+        # selector maps vocabulary column to position in $terms
+        columns = np.flatnonzero(ids >= 0)
+        selector = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int32), (ids[columns], columns)), shape=(len(self.terms), len(terms))
+        )
+        matrix = (self.counts @ selector).tocsr()
+        if binary:
+            matrix.data[:] = 1
+        return matrix, terms
+
+    def matrix(self, terms=None, binary=True):
+        """Document co-occurrence. Diagonal is document frequency if $binary.
+
+        Args:
+            terms (list): terms to be counted. all terms if None
+            binary (bool): if True count documents having both terms, else product of counts in each document
+        Return:
+            cooccurrence (scipy csr_matrix): len(terms) x len(terms)
+            terms (list): terms of rows and columns
+        """
+        matrix, terms = self.doc_term_matrix(terms, binary)
+        return (matrix.T @ matrix).tocsr(), terms
+
+    def window_matrix(self, window, terms=None):
+        """Window co-occurrence. Each pair of tokens at most $window apart in the same document is counted in both directions.
+
+        Args:
+            window (int): maximum distance of tokens
+            terms (list): terms to be counted. all terms if None
+        Return:
+            cooccurrence (scipy csr_matrix): len(terms) x len(terms)
+            terms (list): terms of rows and columns
+        """
+        terms, ids = self._term_ids(terms)
+        lookup = np.full(len(self.terms), -1, dtype=np.int64)
+        lookup[ids[ids >= 0]] = np.flatnonzero(ids >= 0)
+
+        doc_of_token = np.repeat(np.arange(self.n_docs), np.diff(self.indptr))
+        mapped = lookup[self.ids] if len(self.ids) else self.ids
+
+        rows, cols = list(), list()
+        for offset in range(1, window + 1):
+            src, dst = mapped[:-offset], mapped[offset:]
+            mask = (doc_of_token[:-offset] == doc_of_token[offset:]) & (src >= 0) & (dst >= 0)
+            rows += [src[mask], dst[mask]]
+            cols += [dst[mask], src[mask]]
+
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+        cooccurrence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(terms), len(terms))
+        )
+        cooccurrence.sum_duplicates()
+        return cooccurrence, terms
+
+    def document_frequency(self, terms=None):
+        """Number of documents having each term over whole corpus. Marginal of document co-occurrence.
+
+        Args:
+            terms (list): terms to be counted. all terms if None
+        Return:
+            n_docs (int): number of documents
+            frequency (numpy array): document frequency of each term in $terms
+        """
+        terms, ids = self._term_ids(terms)
+        df = np.bincount(self.counts.indices, minlength=len(self.terms))
+        return self.n_docs, np.where(ids >= 0, df[ids], 0)
+
+    def window_frequency(self, window, terms=None):
+        """Number of window pairs of each term over whole corpus. Marginal of window co-occurrence.
+
+        Args:
+            window (int): maximum distance of tokens
+            terms (list): terms to be counted. all terms if None
+        Return:
+            n_pairs (int): total number of window pairs counted in both directions
+            frequency (numpy array): number of window pairs having each term in $terms
+        """
+        terms, ids = self._term_ids(terms)
+        cooccurrence, _ = self.window_matrix(window)
+        frequency = np.asarray(cooccurrence.sum(axis=1)).ravel()
+        return int(frequency.sum()), np.where(ids >= 0, frequency[ids], 0)
+
+    @staticmethod
+    def weight(cooccurrence, total, marginal, measure='pmi'):
+        """Weight co-occurrence with pointwise mutual information log(total * c_xy / (m_x * m_y)).
+            $total and $marginal are corpus-level, ex) document_frequency or window_frequency,
+            so weight of pair does not depend on which other terms are kept. Diagonal is excluded.
+
+        Args:
+            cooccurrence (scipy sparse matrix): symmetric co-occurrence, documents having both terms or window pairs
+            total (int): number of documents or window pairs
+            marginal (numpy array): document frequency or number of window pairs of each term
+            measure (str): 'pmi' or 'npmi'
+        Return:
+            weighted (scipy csr_matrix): weighted co-occurrence
+        """
+        coo = sparse.coo_matrix(cooccurrence, dtype=np.float64)
+        mask = coo.row != coo.col
+        rows, cols, data = coo.row[mask], coo.col[mask], coo.data[mask]
+        marginal = np.asarray(marginal, dtype=np.float64)
+
+        p_joint = data / total
+        pmi = np.log(total * data / (marginal[rows] * marginal[cols]))
+        if measure == 'npmi':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pmi = np.where(p_joint < 1, pmi / -np.log(p_joint), 1.0)
+        elif measure != 'pmi':
+            raise ValueError('unknown measure: {}'.format(measure))
+
+        return sparse.csr_matrix((pmi, (rows, cols)), shape=coo.shape)
+
+    @staticmethod
+    def to_frame(cooccurrence, terms):
+        """Dense dataframe of co-occurrence for plotting.
+
+        Args:
+            cooccurrence (scipy sparse matrix): co-occurrence
+            terms (list): terms of rows and columns
+        Return:
+            df (pandas DataFrame): term by term dataframe
+        """
+        return pd.DataFrame(cooccurrence.toarray(), index=terms, columns=terms)
@@ -0,0 +1,239 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Compact tokenized corpus of integer token ids and vectorizer working on it without strings.
+"""
+
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+class TokenCorpus:
+    """Tokenized documents as interned vocabulary and int32 token ids concatenated over documents.
+        Tokens of document i are terms[ids[indptr[i]:indptr[i + 1]]]. Arrays can be memory-mapped from disk.
+
+    Args:
+        terms (list): vocabulary. term of token id
+        ids (numpy array): int32 token ids of every document concatenated
+        indptr (numpy array): int64 offset of each document in $ids. length is number of documents + 1
+        version (str): version of corpus, ex) fingerprint of dataset and tokenizer
+    Return:
+    """
+    def __init__(self, terms, ids, indptr, version=''):
+        self.terms = list(terms)
+        self.vocabulary = {term: idx for idx, term in enumerate(self.terms)}
+        self.ids = ids
+        self.indptr = indptr
+        self.version = version
+
+    @classmethod
+    def from_docs(cls, docs, version=''):
+        """Intern tokens of documents.
+
+        Args:
+            docs (list): list of tokens per document
+            version (str): version of corpus
+        Return:
+            corpus (TokenCorpus): corpus of $docs
+        """
+        vocabulary = dict()
+        ids = list()
+        indptr = [0]
+        for tokens in docs:
+            for token in tokens:
+                ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            indptr.append(len(ids))
+        return cls(list(vocabulary), np.array(ids, dtype=np.int32), np.array(indptr, dtype=np.int64), version)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def doc(self, idx):
+        """Tokens of document.
+
+        Args:
+            idx (int): index of document
+        Return:
+            tokens (list): tokens of document
+        """
+        return [self.terms[i] for i in self.ids[self.indptr[idx]:self.indptr[idx + 1]]]
+
+    def docs(self):
+        """Tokens of every document. For code still working on strings.
+
+        Args:
+        Return:
+            docs (list): list of tokens per document
+        """
+        return [self.doc(idx) for idx in range(len(self))]
+
+    def frequency(self):
+        """Number of occurrences of each term.
+
+        Args:
+        Return:
+            frequency (numpy array): frequency in order of $terms
+        """
+        return np.bincount(self.ids, minlength=len(self.terms))
+
+    def doc_term_matrix(self, columns=None):
+        """Document-term count matrix.
+
+        Args:
+            columns (numpy array): column of each term id, -1 to drop term. Default term id itself
+        Return:
+            matrix (scipy csr_matrix): n_docs x n_columns counts
+        """
+        if columns is None:
+            columns = np.arange(len(self.terms))
+        n_columns = int(columns.max()) + 1 if len(columns) else 0
+
+        cols = columns[self.ids] if len(self.ids) else np.array([], dtype=np.int64)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        keep = cols >= 0
+        matrix = sparse.csr_matrix(
+            (np.ones(keep.sum(), dtype=np.int64), (rows[keep], cols[keep])), shape=(len(self), n_columns)
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def save(self, dpath):
+        """Save corpus in directory. Token ids and offsets are saved as .npy to be memory-mapped.
+
+        Args:
+            dpath (str): directory to save
+        Return:
+        """
+        os.makedirs(dpath, exist_ok=True)
+        np.save(os.path.join(dpath, 'ids.npy'), np.asarray(self.ids, dtype=np.int32))
+        np.save(os.path.join(dpath, 'indptr.npy'), np.asarray(self.indptr, dtype=np.int64))
+        with open(os.path.join(dpath, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'terms': self.terms}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, dpath, mmap=True):
+        """Load corpus saved by save.
+
+        Args:
+            dpath (str): directory to load
+            mmap (bool): whether to memory-map token ids and offsets instead of reading
+        Return:
+            corpus (TokenCorpus): loaded corpus
+        """
+        mmap_mode = 'r' if mmap else None
+        with open(os.path.join(dpath, 'vocabulary.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(
+            meta['terms'],
+            np.load(os.path.join(dpath, 'ids.npy'), mmap_mode=mmap_mode),
+            np.load(os.path.join(dpath, 'indptr.npy'), mmap_mode=mmap_mode),
+            meta['version']
+        )
+
+
+def cached_corpus(dpath, version, tokenize):
+    """Load corpus of $version from $dpath, or tokenize and save it if missing or outdated.
+
+    Args:
+        dpath (str): directory of corpus
+        version (str): expected version, ex) fingerprint of dataset and tokenizer
+        tokenize (callable): function returning list of tokens per document
+    Return:
+        corpus (TokenCorpus): memory-mapped corpus
+    """
+    if os.path.exists(os.path.join(dpath, 'vocabulary.json')):
+        corpus = TokenCorpus.load(dpath)
+        if corpus.version == version:
+            return corpus
+    TokenCorpus.from_docs(tokenize(), version).save(dpath)
+    return TokenCorpus.load(dpath)
+
+
+class CorpusVectorizer:
+    """TF-IDF of TokenCorpus without joining tokens back into strings. Same result as
+        TfidfVectorizer(lowercase=False, min_df=$min_df) over space-joined nouns longer than $min_length - 1,
+        and exposes get_feature_names for pyLDAvis.
+
+    Args:
+        min_df (int): minimum number of documents having term
+        min_length (int): minimum length of term
+        use_idf (bool): if False, raw counts are returned by transform
+    Return:
+    """
+    def __init__(self, min_df=1, min_length=2, use_idf=True):
+        self.min_df = min_df
+        self.min_length = min_length
+        self.use_idf = use_idf
+
+        self.vocabulary_ = None
+        self.idf_ = None
+
+    def _columns(self, corpus):
+        columns = np.full(len(corpus.terms), -1, dtype=np.int64)
+        for term, column in self.vocabulary_.items():
+            idx = corpus.vocabulary.get(term)
+            if idx is not None:
+                columns[idx] = column
+        return columns
+
+    def fit(self, corpus):
+        """Select terms and learn idf.
+
+        Args:
+            corpus (TokenCorpus): corpus to be fitted
+        Return:
+            self (CorpusVectorizer): fitted vectorizer
+        """
+        self.fit_transform(corpus)
+        return self
+
+    def fit_transform(self, corpus):
+        """Select terms, learn idf and transform corpus.
+
+        Args:
+            corpus (TokenCorpus): corpus to be fitted
+        Return:
+            matrix (scipy csr_matrix): n_docs x n_features tf-idf
+        """
+        counts = corpus.doc_term_matrix()
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+
+        # features in alphabetical order as TfidfVectorizer
+        selected = [
+            idx for idx, term in enumerate(corpus.terms) if len(term) >= self.min_length and df[idx] >= self.min_df
+        ]
+        selected.sort(key=lambda idx: corpus.terms[idx])
+        self.vocabulary_ = {corpus.terms[idx]: column for column, idx in enumerate(selected)}
+
+        n_docs = counts.shape[0]
+        self.idf_ = np.log((1 + n_docs) / (1 + df[selected])) + 1
+        return self.transform(corpus)
+
+    def transform(self, corpus):
+        """Transform corpus with fitted terms and idf.
+
+        Args:
+            corpus (TokenCorpus): corpus to be transformed
+        Return:
+            matrix (scipy csr_matrix): n_docs x n_features tf-idf, or counts if not $use_idf
+        """
+        columns = self._columns(corpus)
+        matrix = corpus.doc_term_matrix(columns)
+        matrix.resize((len(corpus), len(self.vocabulary_)))
+        if not self.use_idf:
+            return matrix
+
+        matrix = matrix.astype(np.float64) @ sparse.diags(self.idf_)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+    def get_feature_names(self):
+        return sorted(self.vocabulary_, key=self.vocabulary_.get)
+
+    def get_feature_names_out(self):
+        return np.array(self.get_feature_names(), dtype=object)
@@ -6,17 +6,39 @@ Objective: Cawling Article Data from RISS.
 """
 
 import time
-import re
 import os
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 
-import numpy as np
 import pandas as pd
 
 from tqdm import tqdm
 
+from article_writer import ArticleWriter
+from fetching_article import AsyncHTTPFetcher
+from html_cache import RawHTMLCache
+from parsing_article import INFO_DETAIL_SELECTOR, parse_article
+from pipeline_article import ArticlePipeline
+from rate_limiter import AdaptiveRateLimiter
+
+
+ARTICLE_COLUMNS = [
+    'title', 'author', 'organization', 'name', 'volno', 'year', 'language', 'keyword', 'kdc', 'kci', 'media', 'page', 
+    'citation', 'link', 'abstract', 'location'
+]
+
+RESULT_LIST_SELECTOR = '#soptionview > div > div.srchResultW.bd.bd2 > div.srchResultListW > ul > li'
+MORE_TEXT_SELECTOR = 'div.innerCont div.content div.text'
+
 
 class CrawlingArticle:
     """Crawling 한국음악치료학회지 Article from RISS.
@@ -25,16 +47,28 @@ class CrawlingArticle:
         driver_path (str): local driver path
         base_url (str): 한국음악치료학회지 RISS URL
         headless (boolean): whether driver works in headless
+        timeout (float): maximum seconds to wait for element to be rendered
+        rate_limiter (AdaptiveRateLimiter): shared throttle. create new one if None
+        cache (RawHTMLCache): raw HTML store filled while crawling. not saved if None
     Return:
     """
-    def __init__(self, driver_path, base_url, headless=True):
+    def __init__(self, driver_path, base_url, headless=True, timeout=10, rate_limiter=None, cache=None):
         options = webdriver.ChromeOptions()
         if headless:    
             options.add_argument('headless')
             options.add_argument('window-size=1920x1080')
             options.add_argument('disable-gpu')
         self.driver = webdriver.Chrome(driver_path, options=options)
+        self.driver_path = driver_path
         self.base_url = base_url
+        self.headless = headless
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        self.cache = cache
+        self.latencies = list()
+
+        parsed = urlparse(base_url)
+        self.host = '{}://{}'.format(parsed.scheme, parsed.netloc)
 
 
     def open(self, url=None):
@@ -50,165 +84,454 @@ class CrawlingArticle:
             self.driver.get(self.base_url)
 
 
-    def crawl_title_url(self, save_fpath):
-        '''Crawl Article Title and URL. Save to $save_fpath in csv format
+    def wait_for(self, condition):
+        '''Wait until condition is satisfied or timeout.
+        
+        Args:
+            condition (callable): selenium expected condition. 
+        Return:
+            elapsed (float): seconds waited
+            timeout (boolean): whether waiting is timed out
+        '''
+        start = time.perf_counter()
+        try:
+            WebDriverWait(self.driver, self.timeout).until(condition)
+            timeout = False
+        except TimeoutException:
+            timeout = True
+        return time.perf_counter() - start, timeout
+
+
+    def record_latency(self, url, fetch, wait, timeout):
+        '''Record latency of a page and let rate limiter adapt to it.
+        
+        Args:
+            url (str): url of page
+            fetch (float): seconds taken to request page
+            wait (float): seconds taken to wait for elements
+            timeout (boolean): whether waiting is timed out
+        Return:
+        '''
+        self.latencies.append({'url': url, 'fetch': fetch, 'wait': wait, 'timeout': timeout})
+        self.rate_limiter.update(fetch + wait, error=timeout)
+
+
+    def latency_summary(self):
+        '''Summarize recorded per-page latencies.
+        
+        Args:
+        Return:
+            summary (pandas DataFrame): statistics of fetch and wait seconds
+        '''
+        return pd.DataFrame(self.latencies, columns=['url', 'fetch', 'wait', 'timeout']).describe()
+
+
+    def crawl_title_url(self, save_fpath, incremental=False, refresh_latest=True):
+        '''Crawl Article Title and URL. Save to $save_fpath in csv format.
+            Issues visited are recorded in manifest($save_fpath with -issues.json). 
+            In incremental mode, only issues not in manifest are visited and only new title-url rows are appended.
         
         Args:
             save_fpath (str): save path. 
+            incremental (boolean): whether to visit new issues only. Default False.
+            refresh_latest (boolean): whether to visit issues of year listed first(the latest) again in incremental mode, 
+                because articles can be added to issue being published. Default True.
         Return:
+            new_df (pandas DataFrame): title-url rows newly added
         '''
+        manifest_fpath = os.path.splitext(save_fpath)[0] + '-issues.json'
+        incremental = incremental and os.path.exists(save_fpath)
+
+        manifest = dict()
+        known_urls = set()
+        if incremental:
+            known_urls = set(pd.read_csv(save_fpath, encoding='utf-8').url)
+            if os.path.exists(manifest_fpath):
+                with open(manifest_fpath, encoding='utf-8') as f:
+                    manifest = json.load(f)
+
         titles = list()
         urls = list()
 
         year_elements = self.driver.find_elements_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li')
         for idx in range(len(year_elements)):
-            self.driver.execute_script(
-                'arguments[0].click();', 
-                self.driver.find_element_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/a'.format(idx + 1))
-            )
-            time.sleep(1)
+            year_link = self.driver.find_element_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/a'.format(idx + 1))
+            year_label = ' '.join(year_link.get_attribute('textContent').split())
+            self.driver.execute_script('arguments[0].click();', year_link)
+            self.wait_for(EC.presence_of_element_located(
+                (By.XPATH, '//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/ul/li'.format(idx + 1))
+            ))
 
             no_elements = self.driver.find_elements_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/ul/li'.format(idx + 1))
             for jdx in range(len(no_elements)):
-                self.driver.execute_script(
-                    'arguments[0].click();', 
-                    self.driver.find_element_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/ul/li[{}]/a'.format(idx + 1, jdx + 1))
-                )
-                time.sleep(3)
+                no_link = self.driver.find_element_by_xpath('//*[@id="divContent"]/div[1]/div/div[2]/ul/li[{}]/ul/li[{}]/a'.format(idx + 1, jdx + 1))
+                issue = '{} / {}'.format(year_label, ' '.join(no_link.get_attribute('textContent').split()))
+                if incremental and issue in manifest and not (refresh_latest and idx == 0):
+                    continue
+
+                self.rate_limiter.wait()
+                previous = self.driver.find_elements_by_css_selector(RESULT_LIST_SELECTOR)
+                start = time.perf_counter()
+                self.driver.execute_script('arguments[0].click();', no_link)
+                fetch = time.perf_counter() - start
+
+                wait, timeout = 0.0, False
+                if previous:
+                    wait, timeout = self.wait_for(EC.staleness_of(previous[0]))
+                elapsed, stale_timeout = self.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, RESULT_LIST_SELECTOR)))
+                self.record_latency(issue, fetch, wait + elapsed, timeout or stale_timeout)
 
                 html = self.driver.page_source
+                if self.cache is not None:
+                    self.cache.put('{}#{}'.format(self.base_url, issue), html)
                 soup = BeautifulSoup(html, 'html.parser')
 
-                elements = soup.select('#soptionview > div > div.srchResultW.bd.bd2 > div.srchResultListW > ul > li')
+                elements = soup.select(RESULT_LIST_SELECTOR)
+                if issue in manifest and manifest[issue] != len(elements):
+                    print('{:s} changed: {} -> {} articles'.format(issue, manifest[issue], len(elements)))
+                manifest[issue] = len(elements)
+
                 for element in elements:
                     title = element.find('div', 'cont').find('p', 'title').get_text().strip()
                     url = element.find('div', 'cont').find('p', 'title').find('a')['href']
+                    # full crawl keeps every listed row, only incremental crawl skips urls already known
+                    if incremental and url in known_urls:
+                        continue
                     print('{:s}\t{:s}'.format(title, url))
+                    known_urls.add(url)
                     titles.append(title)
                     urls.append(url)
         
         df = pd.DataFrame(columns=['title', 'url'])
         df['title'] = titles
         df['url'] = urls
-        df.to_csv(save_fpath, encoding='utf-8', index=False)
+        if incremental:
+            df.to_csv(save_fpath, encoding='utf-8', index=False, mode='a', header=False)
+        else:
+            df.to_csv(save_fpath, encoding='utf-8', index=False)
+
+        with open(manifest_fpath, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
 
+        return df
 
-    def crawl_article(self, load_fpath, save_fpath, verbose=False):
-        '''Crawl Article Information. Save to $save_fpath in csv format
+
+    def fetch_article(self, url):
+        '''Open article detail page, expand every moreView and return page source.
+        
+        Args:
+            url (str): article url relative to host. 
+        Return:
+            html (str): page source of article detail page
+        '''
+        self.rate_limiter.wait()
+        start = time.perf_counter()
+        self.open(self.host + url)
+        fetch = time.perf_counter() - start
+
+        wait, timeout = self.wait_for(EC.presence_of_element_located((By.CSS_SELECTOR, INFO_DETAIL_SELECTOR)))
+
+        mores = self.driver.find_elements_by_class_name('moreView')
+        length = self.text_length()
+        for more in mores:
+            self.driver.execute_script('arguments[0].click();', more)
+        if mores:
+            elapsed, more_timeout = self.wait_for(lambda driver: self.expanded(mores, length))
+            wait, timeout = wait + elapsed, timeout or more_timeout
+        self.record_latency(url, fetch, wait, timeout)
+
+        return self.driver.page_source
+
+
+    def text_length(self):
+        '''Length of text in additional information sections.
+        
+        Args:
+        Return:
+            length (int): number of characters
+        '''
+        try:
+            return sum(
+                len(element.get_attribute('textContent') or '') 
+                for element in self.driver.find_elements_by_css_selector(MORE_TEXT_SELECTOR)
+            )
+        except StaleElementReferenceException:
+            return -1
+
+
+    def expanded(self, mores, length):
+        '''Whether clicked moreView sections are expanded. Text sections exist before expansion,
+            so expanded when every moreView is hidden or detached, or text grows longer than before click.
+        
+        Args:
+            mores (list): clicked moreView elements
+            length (int): text_length before click
+        Return:
+            expanded (boolean): whether expanded
+        '''
+        hidden = True
+        for more in mores:
+            try:
+                if more.is_displayed():
+                    hidden = False
+                    break
+            except StaleElementReferenceException:
+                continue
+        return hidden or self.text_length() > length
+
+
+    def fetch_many(self, urls):
+        '''Fetch detail pages one by one with driver. Same interface with AsyncHTTPFetcher.
+        
+        Args:
+            urls (list): article urls relative to host. 
+        Return:
+            htmls (list): page sources in the order of $urls
+        '''
+        return [self.fetch_article(url) for url in urls]
+
+
+    @staticmethod
+    def parse_article(html):
+        '''Parse article detail page into article record. See parsing_article.
+        
+        Args:
+            html (str): page source of article detail page. 
+        Return:
+            article (dict): column-value dictionary except title
+        '''
+        return parse_article(html, backend='lxml')
+
+
+    def fetch_pages(self, fetcher, urls):
+        '''Fetch pages by $fetcher. Page not fetched or not rendered without script is fetched again by driver.
+        
+        Args:
+            fetcher (object): object with fetch_many(urls) such as AsyncHTTPFetcher. 
+            urls (list): article urls relative to host. 
+        Return:
+            htmls (list): page sources in the order of $urls
+        '''
+        htmls = fetcher.fetch_many(urls)
+        for idx, (url, html) in enumerate(zip(urls, htmls)):
+            if html is None or 'infoDetailL' not in html:
+                html = self.fetch_article(url)
+                htmls[idx] = html
+            if self.cache is not None:
+                self.cache.put(url, html)
+        return htmls
+
+
+    def crawl_article(self, load_fpath, save_fpath, verbose=False, checkpoint_fpath=None, flush_every=10, fetcher=None, batch_size=32, urls=None, n_parsers=0, queue_size=64):
+        '''Crawl Article Information. Save to $save_fpath in csv format.
+            Each article is appended to $checkpoint_fpath as soon as it is crawled, 
+            and articles already in $checkpoint_fpath are skipped when crawl is restarted.
+            Pages are fetched by $fetcher, and page not fetched or not rendered without script is fetched again by driver.
+            If $n_parsers > 0, fetching and parsing run concurrently in ArticlePipeline.
         
         Args:
             load_fpath (str): path to load artitle-url. 
             save_fpath (str): save path. 
             verbose (boolean): whether to show data while progressing. Default Fasle. 
+            checkpoint_fpath (str): JSONL path of streamed articles. Default $save_fpath with .jsonl extension.
+            flush_every (int): number of articles between flush to disk. Default 10.
+            fetcher (object): object with fetch_many(urls) such as AsyncHTTPFetcher. Default driver of this crawler.
+            batch_size (int): number of pages requested to fetcher at once. Default 32.
+            urls (list): crawl only these urls, ex) new urls from incremental crawl_title_url. Default all urls.
+            n_parsers (int): number of parsing processes. parse in this process if 0. Default 0.
+            queue_size (int): maximum number of pages waiting to be parsed. Default 64.
         Return:
         '''
         title_url_df = pd.read_csv(load_fpath, encoding='utf-8')
+        targets = set(title_url_df.url) if urls is None else set(urls)
+
+        if checkpoint_fpath is None:
+            checkpoint_fpath = os.path.splitext(save_fpath)[0] + '.jsonl'
+        if fetcher is None:
+            fetcher = self
+            batch_size = 1
+
+        if urls is not None and os.path.exists(save_fpath) and not os.path.exists(checkpoint_fpath):
+            # article csv crawled before checkpoint is in the order of title-url. keep its rows in export
+            article_df = pd.read_csv(save_fpath, encoding='utf-8')
+            with ArticleWriter(checkpoint_fpath, flush_every) as writer:
+                for url, (_, row) in zip(title_url_df.url, article_df.iterrows()):
+                    writer.write(url, row.to_dict())
 
-        article_dict = {
-            'title': list(), 'author': list(), 'organization': list(), 'name': list(), 'volno': list(), 'year': list(), 
-            'language': list(), 'keyword': list(), 'kdc': list(), 'kci': list(), 'media': list(), 'page': list(), 
-            'citation': list(), 'link': list(), 'abstract': list(), 'location': list()
-        }
-
-        for idx in tqdm(range(len(title_url_df))):
-            title = title_url_df.loc[idx, 'title']
-            url = title_url_df.loc[idx, 'url']
-            url = 'http://www.riss.kr' + url
-            self.open(url)
-            time.sleep(3)
-    
-            mores = self.driver.find_elements_by_class_name('moreView')
-            for more in mores:
-                self.driver.execute_script('arguments[0].click();', more)
-                time.sleep(1)
-            time.sleep(1)
-
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-    
-            author = np.nan
-            org = '한국음악치료학회'
-            name = '한국음악치료학회지'
-            volno = np.nan
-            year = np.nan
-            lang = np.nan
-            keyword = np.nan
-            kdc = np.nan
-            kci = np.nan
-            media = '학술저널'
-            page = np.nan
-            citation = np.nan
-            link = np.nan
-            abstract = np.nan
-            loc = np.nan
-    
-            elements = soup.select('#soptionview > div > div.thesisInfo > div.infoDetail > div.infoDetailL > ul > li')
-            for element in elements:
-                key = element.find('span', 'strong').get_text().strip()
-                value = element.find('div').get_text().strip()
+        with ArticleWriter(checkpoint_fpath, flush_every) as writer:
+            rows = [
+                (title, url) for title, url in zip(title_url_df.title, title_url_df.url) 
+                if url in targets and url not in writer.completed
+            ]
+
+            pipeline = None
+            if n_parsers > 0:
+                pipeline = ArticlePipeline(lambda batch: self.fetch_pages(fetcher, batch), n_parsers, queue_size, batch_size)
+                results = pipeline.run(rows)
+            else:
+                results = self._fetch_parse(rows, fetcher, batch_size)
+
+            for title, url, html, article in tqdm(results, total=len(rows)):
+                article['title'] = title
                 
-                if key == '저자':
-                    author = value
-                elif key == '발행기관':
-                    org = value
-                elif key == '학술지명':
-                    name = value
-                elif key == '권호사항':
-                    volno = ' '.join(value.split())
-                elif key == '발행연도':
-                    year = value
-                elif key == '작성언어':
-                    lang = value
-                elif key == '주제어':
-                    keyword = ' '.join(value.split())
-                elif key == 'KDC':
-                    kdc = value
-                elif key == '등재정보':
-                    kci = value
-                elif key == '자료형태':
-                    media = value
-                elif key == '수록면':
-                    page = value
-                elif key == 'KCI 피인용지수' or key == 'KCI 피인용횟수':
-                    citation = value
-                elif key == '제공처':
-                    link = value
-                elif key == '소장기관':
-                    loc = value
-                else:
-                    print('*********New Key: {:s}*********'.format(key))
-
-            additionals = soup.find_all('div', 'innerCont')
-            for addition in additionals:
-                if addition.find('h3', 'tit').get_text().strip() == '부가정보':
-                    contents = addition.select('div.content > div')
-                    for content in contents:
-                        if content.find('p', 'title').get_text().strip() == '국문 초록 (Abstract)':
-                            abstract = content.find_all('div', 'text')[1].find('p').get_text().strip()
-                            break
-            
-            if verbose:
-                print('{:s}\t{:s}\t{:s}\n\t{:s}'.format(title, volno, keyword, abstract))
-    
-            article_dict['title'].append(title)
-            article_dict['author'].append(author)
-            article_dict['organization'].append(org)
-            article_dict['name'].append(name)
-            article_dict['volno'].append(volno)
-            article_dict['year'].append(year)
-            article_dict['language'].append(lang)
-            article_dict['keyword'].append(keyword)
-            article_dict['kdc'].append(kdc)
-            article_dict['kci'].append(kci)
-            article_dict['media'].append(media)
-            article_dict['page'].append(page)
-            article_dict['citation'].append(citation)
-            article_dict['link'].append(link)
-            article_dict['abstract'].append(abstract)  
-            article_dict['location'].append(loc)  
-
-        article_df = pd.DataFrame(article_dict)
-        article_df.to_csv(save_fpath, encoding='utf-8', index=False)
+                if verbose:
+                    print('{:s}\t{:s}\t{:s}\n\t{:s}'.format(title, str(article['volno']), str(article['keyword']), str(article['abstract'])))
+        
+                writer.write(url, article)
+
+            if pipeline is not None:
+                print(pd.DataFrame(pipeline.summary()))
+            writer.export_csv(title_url_df.url, save_fpath, ARTICLE_COLUMNS)
+
+
+    def _fetch_parse(self, rows, fetcher, batch_size):
+        '''Fetch and parse rows one batch after another. Used by crawl_article.
+        
+        Args:
+            rows (list): list of (title, url)
+            fetcher (object): object with fetch_many(urls)
+            batch_size (int): number of pages requested to fetcher at once
+        Return:
+            results (generator): (title, url, html, article) in the order of $rows
+        '''
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            htmls = self.fetch_pages(fetcher, [url for _, url in batch])
+            for (title, url), html in zip(batch, htmls):
+                yield title, url, html, self.parse_article(html)
+
+
+    def _crawl_shard(self, shard, writer, n_retry, verbose):
+        '''Crawl a shard of title-url rows with its own driver. Used by crawl_article_parallel.
+        
+        Args:
+            shard (list): list of (title, url)
+            writer (ArticleWriter): writer shared among workers
+            n_retry (int): number of attempts per article
+            verbose (boolean): whether to show data while progressing.
+        Return:
+            n_failed (int): number of articles failed after $n_retry attempts
+        '''
+        worker = CrawlingArticle(self.driver_path, self.base_url, self.headless, self.timeout, self.rate_limiter, self.cache)
+        n_failed = 0
+        try:
+            for title, url in shard:
+                article = None
+                for attempt in range(n_retry):
+                    try:
+                        html = worker.fetch_article(url)
+                        article = worker.parse_article(html)
+                        if self.cache is not None:
+                            self.cache.put(url, html)
+                        break
+                    except Exception as e:
+                        print('retry {}/{} {:s}: {}'.format(attempt + 1, n_retry, url, e))
+                        self.rate_limiter.update(0.0, error=True)
+                        self.latencies += worker.latencies
+                        worker.close()
+                        worker = CrawlingArticle(self.driver_path, self.base_url, self.headless, self.timeout, self.rate_limiter, self.cache)
+
+                if article is None:
+                    # not checkpointed, so restarted crawl tries again
+                    n_failed += 1
+                    continue
+                article['title'] = title
+
+                if verbose:
+                    print('{:s}\t{:s}\t{:s}'.format(title, str(article['volno']), str(article['keyword'])))
+                writer.write(url, article)
+        finally:
+            self.latencies += worker.latencies
+            worker.close()
+
+        return n_failed
+
+
+    def crawl_article_parallel(self, load_fpath, save_fpath, n_workers=4, n_retry=3, verbose=False, checkpoint_fpath=None, flush_every=10):
+        '''Crawl Article Information with $n_workers drivers in parallel. Save to $save_fpath in csv format.
+            Rows are merged in the order of $load_fpath, so output is same as crawl_article.
+            Checkpoint is shared with crawl_article, so either can resume the other.
+        
+        Args:
+            load_fpath (str): path to load artitle-url. 
+            save_fpath (str): save path. 
+            n_workers (int): maximum number of drivers working at the same time. Default 4.
+            n_retry (int): number of attempts per article before giving up. Default 3.
+            verbose (boolean): whether to show data while progressing. Default Fasle. 
+            checkpoint_fpath (str): JSONL path of streamed articles. Default $save_fpath with .jsonl extension.
+            flush_every (int): number of articles between flush to disk. Default 10.
+        Return:
+        '''
+        title_url_df = pd.read_csv(load_fpath, encoding='utf-8')
+
+        if checkpoint_fpath is None:
+            checkpoint_fpath = os.path.splitext(save_fpath)[0] + '.jsonl'
+
+        with ArticleWriter(checkpoint_fpath, flush_every) as writer:
+            rows = [(title, url) for title, url in zip(title_url_df.title, title_url_df.url) if url not in writer.completed]
+            n_workers = max(1, min(n_workers, len(rows)))
+            shards = [rows[i::n_workers] for i in range(n_workers)]
+
+            n_failed = 0
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(self._crawl_shard, shard, writer, n_retry, verbose) for shard in shards]
+                for future in tqdm(futures):
+                    n_failed += future.result()
+            if n_failed > 0:
+                print('{} articles failed. run again to resume.'.format(n_failed))
+
+            writer.export_csv(title_url_df.url, save_fpath, ARTICLE_COLUMNS)
+
+
+    @staticmethod
+    def reparse(load_fpath, save_fpath, cache, verbose=False, checkpoint_fpath=None):
+        '''Rebuild article CSV and checkpoint from raw HTML cache without network. Use after fixing parser.
+            Checkpoint is rewritten too, otherwise next crawl_article would export stale records again.
+            Record of article not in cache is kept as it is.
+        
+        Args:
+            load_fpath (str): path to load artitle-url. 
+            save_fpath (str): save path. 
+            cache (RawHTMLCache): raw HTML store filled by crawl_article
+            verbose (boolean): whether to show data while progressing. Default Fasle. 
+            checkpoint_fpath (str): JSONL path of streamed articles. Default $save_fpath with .jsonl extension.
+        Return:
+            n_missing (int): number of articles not in cache
+        '''
+        title_url_df = pd.read_csv(load_fpath, encoding='utf-8')
+        if checkpoint_fpath is None:
+            checkpoint_fpath = os.path.splitext(save_fpath)[0] + '.jsonl'
+        tmp_fpath = checkpoint_fpath + '.tmp'
+        if os.path.exists(tmp_fpath):
+            os.remove(tmp_fpath)
+
+        n_missing = 0
+        with ArticleWriter(tmp_fpath) as writer:
+            for title, url in tqdm(zip(title_url_df.title, title_url_df.url), total=len(title_url_df)):
+                html = cache.get(url)
+                if html is None:
+                    n_missing += 1
+                    continue
+
+                article = CrawlingArticle.parse_article(html)
+                article['title'] = title
+                if verbose:
+                    print('{:s}\t{:s}\t{:s}'.format(title, str(article['volno']), str(article['keyword'])))
+                writer.write(url, article)
+
+            if os.path.exists(checkpoint_fpath):
+                with open(checkpoint_fpath, encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            record = json.loads(line)
+                            url = record.pop('url')
+                            if url not in writer.completed:
+                                writer.write(url, record)
+        os.replace(tmp_fpath, checkpoint_fpath)
+
+        with ArticleWriter(checkpoint_fpath) as writer:
+            writer.export_csv(title_url_df.url, save_fpath, ARTICLE_COLUMNS)
+        return n_missing
 
 
     def close(self):
@@ -221,23 +544,36 @@ class CrawlingArticle:
 
 
 if __name__ == '__main__':
+    cache = RawHTMLCache('./data/html')
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'reparse':
+        # $ python crawling_data.py reparse
+        n_missing = CrawlingArticle.reparse('./data/title-url.csv', './data/article_raw.csv', cache)
+        print('{} articles are not in cache'.format(n_missing))
+        sys.exit()
+
     driver_path = './driver/chromedriver'
     base_url = 'http://www.riss.kr/search/detail/DetailView.do?p_mat_type=3a11008f85f7c51d&control_no=2a75a048a6856c25ffe0bdc3ef48d419'
-    crawler = CrawlingArticle(driver_path, base_url, True)
+    crawler = CrawlingArticle(driver_path, base_url, True, cache=cache)
 
     crawler.open()
-    time.sleep(0.5)
+    crawler.wait_for(EC.presence_of_element_located((By.XPATH, '//*[@id="divContent"]/div[1]/div/div[2]/ul/li')))
 
     save_fpath = './data/title-url.csv'
-    if not os.path.exists(save_fpath):
-        crawler.crawl_title_url(save_fpath)
-    time.sleep(0.5)
+    new_df = crawler.crawl_title_url(save_fpath, incremental=True)
+    print('{} new articles'.format(len(new_df)))
 
     load_fpath = save_fpath
     save_fpath = './data/article_raw.csv'
-    if not os.path.exists(save_fpath):
-        crawler.crawl_article(load_fpath, save_fpath)
-    time.sleep(0.5)
+    if not os.path.exists(save_fpath) or len(new_df) > 0:
+        fetcher = AsyncHTTPFetcher(crawler.host, n_connections=8, rate_limiter=crawler.rate_limiter)
+        crawler.crawl_article(
+            load_fpath, save_fpath, fetcher=fetcher, urls=None if not os.path.exists(save_fpath) else new_df.url,
+            n_parsers=os.cpu_count()
+        )
+        crawler.latencies += fetcher.latencies
+        fetcher.close()
 
+    print(crawler.latency_summary())
     crawler.close()
 
@@ -0,0 +1,126 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Near-duplicate article detection with MinHash and LSH.
+"""
+
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# prime larger than 2^32. (a * h + b) fits in uint64 for 32-bit a, b, h
+MERSENNE_PRIME = np.uint64(4294967311)
+
+
+class NearDuplicateDetector:
+    """Detect near-duplicate articles with MinHash signature of character shingles and LSH banding.
+        Only records sharing a band bucket are compared, so time is near-linear in number of records.
+
+    Args:
+        n_perm (int): number of hash permutations of signature
+        n_bands (int): number of LSH bands. $n_perm must be divisible by $n_bands
+        shingle_size (int): number of characters per shingle
+        threshold (float): estimated jaccard similarity regarded as duplicate
+        max_bucket (int): bucket larger than this is compared to its first record only
+        seed (int): random seed of permutations
+    Return:
+    """
+    def __init__(self, n_perm=128, n_bands=32, shingle_size=3, threshold=0.8, max_bucket=50, seed=2020):
+        assert n_perm % n_bands == 0
+
+        self.n_perm = n_perm
+        self.n_bands = n_bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_bucket = max_bucket
+
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 32, size=n_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2 ** 32, size=n_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        """Hash character shingles of text. White spaces are removed and letters are lowered.
+
+        Args:
+            text (str): text of record
+        Return:
+            hashes (numpy array): unique uint64 hash of shingles
+        """
+        text = ''.join(text.lower().split())
+        if len(text) < self.shingle_size:
+            text = text.ljust(self.shingle_size)
+        grams = {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+        return np.array([zlib.crc32(gram.encode('utf-8')) for gram in grams], dtype=np.uint64)
+
+    def signature(self, text):
+        """MinHash signature of text.
+
+        Args:
+            text (str): text of record
+        Return:
+            signature (numpy array): uint64 array of length $n_perm
+        """
+        hashes = self.shingles(text)
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def _candidates(self, signatures):
+        rows = self.n_perm // self.n_bands
+        for band in range(self.n_bands):
+            buckets = defaultdict(list)
+            band_signatures = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            for idx in range(len(band_signatures)):
+                buckets[band_signatures[idx].tobytes()].append(idx)
+
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) > self.max_bucket:
+                    for other in members[1:]:
+                        yield members[0], other
+                else:
+                    for i in range(len(members)):
+                        for j in range(i + 1, len(members)):
+                            yield members[i], members[j]
+
+    def detect(self, texts):
+        """Cluster near-duplicate texts. First record of each cluster is kept, the others are duplicates.
+
+        Args:
+            texts (list): text of each record, ex) title + abstract
+        Return:
+            is_duplicated (numpy array): bool per record
+            scores (numpy array): highest similarity to another record in cluster. 0 if not clustered
+            clusters (numpy array): cluster id(index of first record in cluster) per record
+        """
+        n = len(texts)
+        signatures = np.empty((n, self.n_perm), dtype=np.uint64)
+        for idx, text in enumerate(texts):
+            signatures[idx] = self.signature(text)
+
+        parents = np.arange(n)
+
+        def find(x):
+            while parents[x] != x:
+                parents[x] = parents[parents[x]]
+                x = parents[x]
+            return x
+
+        scores = np.zeros(n)
+        checked = set()
+        for i, j in self._candidates(signatures):
+            if (i, j) in checked:
+                continue
+            checked.add((i, j))
+
+            similarity = (signatures[i] == signatures[j]).mean()
+            if similarity >= self.threshold:
+                scores[i] = max(scores[i], similarity)
+                scores[j] = max(scores[j], similarity)
+                root_i, root_j = find(i), find(j)
+                parents[max(root_i, root_j)] = min(root_i, root_j)
+
+        clusters = np.array([find(idx) for idx in range(n)])
+        is_duplicated = clusters != np.arange(n)
+        return is_duplicated, scores, clusters
@@ -5,13 +5,10 @@ Date: 2020-06-22 (Last Modified)
 Objective: EDA. 
 """
 
-from ast import literal_eval
-
-import pandas as pd
-
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
-import seaborn as sns
+from deduplication import NearDuplicateDetector
+from figure_report import Figure, FigureReport, barplot, lineplot
+from startup import StartupReport, plotting
+from storage import LIST_COLUMNS, load_dataframe, parse_list_column, save_dataframe
 
 class EDA:
     """EDA for 한국음악치료학회지 Article from RISS.
@@ -20,16 +17,57 @@ class EDA:
         fpath (str): local csv file path for EDA
     Return:
     """
+    FONT = ('./static/fonts/NanumGothic.ttf', 14)
+
     def __init__(self, fpath):
-        self.dataframe = pd.read_csv(fpath, encoding='utf-8')
+        self.report = StartupReport('EDA')
+        with self.report.measure('dataframe'):
+            # list columns of CSV are parsed when first used. see parse_list_columns
+            self.dataframe = load_dataframe(fpath, list_columns=[])
+        self.unparsed = set(LIST_COLUMNS)
+        self._plotting = None
+        self.renderer = None
+
+    def parse_list_columns(self, columns=LIST_COLUMNS):
+        """parse list columns not parsed yet.
+
+        Args:
+            columns (list): list columns to be parsed
+        Return:
+        """
+        for column in columns:
+            if column in self.unparsed and column in self.dataframe.columns:
+                with self.report.measure('parse_' + column):
+                    self.dataframe[column] = parse_list_column(self.dataframe[column])
+            self.unparsed.discard(column)
+
+    def plotting(self):
+        """matplotlib and seaborn with korean font. Imported and set on first plot.
+
+        Args:
+        Return:
+            plt (module): matplotlib.pyplot
+            sns (module): seaborn
+        """
+        if self._plotting is None:
+            with self.report.measure('plotting'):
+                self._plotting = plotting(*self.FONT)
+        return self._plotting
 
-        # initializt matplotlib korean setting
-        fname = './static/fonts/NanumGothic.ttf'
-        ffamily = fm.FontProperties(fname=fname).get_name()
-        plt.rcParams['font.family'] = ffamily
-        plt.rcParams['font.size'] = 14
+    def draw(self, draw, **kwargs):
+        """Draw figure now, or add to $renderer to be rendered in parallel if renderer is set.
 
-        plt.style.use('seaborn-darkgrid')
+        Args:
+            draw (function): drawing function of figure_report, ex) lineplot
+            kwargs (dict): arguments of $draw including fpath
+        Return:
+        """
+        figure = Figure(draw, kwargs, self.FONT)
+        if self.renderer is not None:
+            self.renderer.add(figure)
+        else:
+            plt, sns = self.plotting()
+            draw(plt, sns, **kwargs)
 
     def show_samples(self, n):
         """show sample of record
@@ -51,8 +89,27 @@ class EDA:
         """
         self.dataframe = self.dataframe[columns]
 
+    def detect_duplicates(self, threshold=0.8):
+        """mark near-duplicate records with MinHash/LSH over title and abstract. 
+            is_duplicated(marked manually) is overwritten. first record of each cluster is kept.
+
+        Args:
+            threshold (float): estimated jaccard similarity regarded as duplicate
+        Return:
+            n_duplicated (int): number of duplicated record
+        """
+        texts = self.dataframe.title.fillna('') + ' ' + self.dataframe.abstract.fillna('')
+
+        detector = NearDuplicateDetector(threshold=threshold)
+        is_duplicated, scores, clusters = detector.detect(texts.tolist())
+
+        self.dataframe['is_duplicated'] = is_duplicated
+        self.dataframe['duplicate_score'] = scores
+        self.dataframe['duplicate_cluster'] = self.dataframe.index[clusters]
+        return is_duplicated.sum()
+
     def remove_duplicates(self):
-        """remove duplicated record (marked manually)
+        """remove duplicated record (marked manually or by detect_duplicates)
 
         Args:
         Return:
@@ -119,12 +176,10 @@ class EDA:
 
         language_counts = self.dataframe.language.value_counts().sort_index()
 
-        plt.figure(figsize=(16, 9))
-        sns.barplot(language_counts.index, language_counts.values)
-        plt.xlabel('language')
-        plt.ylabel('number of articles')
-        plt.title('What Language do articles published in?')        
-        plt.savefig('./figure/count_articles_language.png')
+        self.draw(barplot, fpath='./figure/count_articles_language.png',
+                  x=language_counts.index.tolist(), y=language_counts.values.tolist(),
+                  xlabel='language', ylabel='number of articles',
+                  title='What Language do articles published in?')
 
         language_freq = {language:freq for language, freq in language_counts.items()}
         return language_freq
@@ -138,12 +193,10 @@ class EDA:
         """
         year_counts = self.dataframe.year.value_counts().sort_index()
 
-        plt.figure(figsize=(16, 9))
-        sns.lineplot(year_counts.index, year_counts.values)
-        plt.xlabel('year')
-        plt.ylabel('number of articles')
-        plt.title('When do articles published?')        
-        plt.savefig('./figure/count_articles_year.png')
+        self.draw(lineplot, fpath='./figure/count_articles_year.png',
+                  x=year_counts.index.tolist(), y=year_counts.values.tolist(),
+                  xlabel='year', ylabel='number of articles',
+                  title='When do articles published?')
 
         year_freq = {year:freq for year, freq in year_counts.items()}
         return year_freq
@@ -155,18 +208,16 @@ class EDA:
         Return:
             n_keyword_freq (dict): number-frequency dictionary
         """
-        self.dataframe.keyword = self.dataframe.keyword.fillna('[]')
-        self.dataframe.keyword = self.dataframe.keyword.apply(literal_eval)
+        self.parse_list_columns(['keyword'])
+        self.dataframe.keyword = [keyword if isinstance(keyword, list) else [] for keyword in self.dataframe.keyword]
         self.dataframe['n_keyword'] = self.dataframe.keyword.apply(len)
 
         n_keyword_counts = self.dataframe.n_keyword.value_counts().sort_index()
 
-        plt.figure(figsize=(16, 9))
-        sns.lineplot(n_keyword_counts.index, n_keyword_counts.values)
-        plt.xlabel('number of keyword')
-        plt.ylabel('number of articles')
-        plt.title('How many keywords are allocated to article?')        
-        plt.savefig('./figure/count_number_of_keyword.png')
+        self.draw(lineplot, fpath='./figure/count_number_of_keyword.png',
+                  x=n_keyword_counts.index.tolist(), y=n_keyword_counts.values.tolist(),
+                  xlabel='number of keyword', ylabel='number of articles',
+                  title='How many keywords are allocated to article?')
 
         n_keyword_freq = {n_keyword:freq for n_keyword, freq in n_keyword_counts.items()}
         return n_keyword_freq
@@ -183,12 +234,10 @@ class EDA:
 
         len_abstract_counts = self.dataframe.len_abstract.value_counts().sort_index()
 
-        plt.figure(figsize=(16, 9))
-        sns.lineplot(x=len_abstract_counts.index, y=len_abstract_counts.values)
-        plt.xlabel('number of articles')
-        plt.ylabel('length of abstract(number of word in abstract)')
-        plt.title('How mant words are in abstract per article?')        
-        plt.savefig('./figure/count_length_of_abstract.png')
+        self.draw(lineplot, fpath='./figure/count_length_of_abstract.png',
+                  x=len_abstract_counts.index.tolist(), y=len_abstract_counts.values.tolist(),
+                  xlabel='number of articles', ylabel='length of abstract(number of word in abstract)',
+                  title='How mant words are in abstract per article?')
 
         len_abstract_freq = {len_abstract:freq for len_abstract, freq in len_abstract_counts.items()}
         return len_abstract_freq
@@ -198,26 +247,32 @@ class EDA:
         """Save Data for NLP
 
         Args:
-            fpath (str): Save path
+            fpath (str): Save path. Parquet if ends with .parquet else CSV
         Return:
         """
         _ = self.remove_duplicates()
         _ = self.remove_non_articles()
         _ = self.remove_english_articles()
         _ = self.remove_no_abstract_articles()
+        self.parse_list_columns(['keyword'])
 
         self.dataframe = self.dataframe[['title', 'year', 'keyword', 'abstract']]
 
-        self.dataframe.to_csv(fpath, encoding='utf-8', index=False)
+        save_dataframe(self.dataframe, fpath)
 
 
 if __name__ == '__main__':
     eda = EDA(fpath='./data/article_filled.csv')
+    eda.renderer = FigureReport()
+    eda.report.report()
     print(eda.show_samples(10)) 
 
     eda.select_columns(['title', 'year', 'language', 'keyword', 'abstract', 'is_na_keyword', 'is_na_abstract', 'non_article', 'is_duplicated'])
     print(eda.show_samples(10)) 
 
+    n = eda.detect_duplicates()
+    print('{} duplicated record is detected'.format(n))
+
     n = eda.remove_duplicates()
     print('{} duplicated record is removed'.format(n))
 
@@ -231,6 +286,7 @@ if __name__ == '__main__':
     print(eda.count_number_of_keyword())
 
     print(eda.count_length_of_abstract())
+    eda.renderer.render()
 
-    fpath = './data/keyword-abstract.csv'
+    fpath = './data/keyword-abstract.parquet'
     eda.save_data_for_nlp(fpath)
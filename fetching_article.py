@@ -0,0 +1,115 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Selenium-free HTTP fetcher for RISS article detail page.
+"""
+
+import asyncio
+import re
+import time
+
+import aiohttp
+
+from rate_limiter import AdaptiveRateLimiter
+
+
+MORE_VIEW_PATTERN = re.compile(r'<a[^>]*class="[^"]*\bmoreView\b[^"]*"[^>]*>', re.IGNORECASE)
+HREF_PATTERN = re.compile(r'href="([^"#][^"]*)"', re.IGNORECASE)
+
+
+class AsyncHTTPFetcher:
+    """Fetch article detail pages with asyncio HTTP client.
+        One keep-alive connection pool is used for the lifetime of fetcher.
+
+        RISS renders full text of "moreView" sections in the page and only toggles visibility by script,
+        so most pages need single request. moreView linked to another url is fetched and appended to page,
+        then same parser can read it.
+
+    Args:
+        host (str): scheme and host of detail page, ex) http://www.riss.kr
+        n_connections (int): maximum number of concurrent connections
+        timeout (float): seconds to wait for response
+        rate_limiter (AdaptiveRateLimiter): shared throttle. create new one if None
+    Return:
+    """
+    def __init__(self, host, n_connections=8, timeout=10, rate_limiter=None):
+        self.host = host
+        self.n_connections = n_connections
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        self.latencies = list()
+
+        self.loop = asyncio.new_event_loop()
+        self.session = None
+
+    async def _session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.n_connections, keepalive_timeout=30)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': 'Mozilla/5.0'}
+            )
+        return self.session
+
+    async def _get(self, url):
+        session = await self._session()
+        await asyncio.sleep(self.rate_limiter.reserve())
+
+        start = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                html = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            latency = time.perf_counter() - start
+            self.rate_limiter.update(latency, error=True)
+            self.latencies.append({'url': url, 'fetch': latency, 'wait': 0.0, 'timeout': True})
+            print('fetch failed {:s}: {}'.format(url, e))
+            return None
+
+        latency = time.perf_counter() - start
+        self.rate_limiter.update(latency)
+        self.latencies.append({'url': url, 'fetch': latency, 'wait': 0.0, 'timeout': False})
+        return html
+
+    async def _fetch(self, url):
+        html = await self._get(self.host + url)
+        if html is None:
+            return None
+
+        more_urls = list()
+        for tag in MORE_VIEW_PATTERN.findall(html):
+            match = HREF_PATTERN.search(tag)
+            if match and not match.group(1).lower().startswith('javascript'):
+                more_urls.append(match.group(1))
+        if more_urls:
+            mores = await asyncio.gather(*[self._get(self.host + more_url) for more_url in more_urls])
+            html = html.replace('</body>', ''.join(more for more in mores if more is not None) + '</body>')
+
+        return html
+
+    async def _fetch_many(self, urls):
+        return await asyncio.gather(*[self._fetch(url) for url in urls])
+
+    def fetch_many(self, urls):
+        """Fetch detail pages concurrently.
+
+        Args:
+            urls (list): article urls relative to host
+        Return:
+            htmls (list): page sources in the order of $urls. None if failed
+        """
+        return self.loop.run_until_complete(self._fetch_many(urls))
+
+    def close(self):
+        """Close connection pool and event loop.
+
+        Args:
+        Return:
+        """
+        if self.session is not None:
+            self.loop.run_until_complete(self.session.close())
+            self.session = None
+        self.loop.close()
@@ -0,0 +1,211 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Render report figures over process pool. Figure of unchanged data and parameters is skipped.
+"""
+
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from startup import plotting
+
+# draw: function of (plt, sns, fpath, ...), kwargs: arguments of draw including fpath, font: (font path, font size)
+Figure = namedtuple('Figure', ['draw', 'kwargs', 'font'])
+
+
+def barplot(plt, sns, fpath, x, y, xlabel, ylabel, title, figsize=(16, 9), xticks=True):
+    plt.figure(figsize=figsize)
+    sns.barplot(x=x, y=y)
+    if not xticks:
+        plt.xticks([])
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.savefig(fpath)
+
+
+def lineplot(plt, sns, fpath, x, y, xlabel, ylabel, title, figsize=(16, 9)):
+    plt.figure(figsize=figsize)
+    sns.lineplot(x=x, y=y)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.savefig(fpath)
+
+
+def heatmap(plt, sns, fpath, df, title, figsize=(32, 32)):
+    plt.figure(figsize=figsize)
+    sns.heatmap(df, annot=True)
+    plt.title(title)
+    plt.savefig(fpath)
+
+
+def wordcloud(plt, sns, fpath, frequencies, title, font_path='./static/fonts/NanumGothic.ttf', figsize=(12, 12)):
+    from wordcloud import WordCloud
+
+    plt.figure(figsize=figsize)
+    wc = WordCloud(font_path=font_path, width=800, height=800, random_state=2020, background_color='white')
+    wc.generate_from_frequencies(frequencies)
+    plt.imshow(wc)
+    plt.xticks([])
+    plt.yticks([])
+    plt.title(title)
+    plt.tight_layout()
+    plt.savefig(fpath)
+
+
+def draw(figure):
+    """Draw figure in this process.
+
+    Args:
+        figure (Figure): figure to be drawn
+    Return:
+    """
+    plt, sns = plotting(*figure.font)
+    figure.draw(plt, sns, **figure.kwargs)
+
+
+def _update(digest, value):
+    """Feed value into digest. Equal data gives equal bytes however it is built, unlike pickle of DataFrame."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        digest.update(repr(list(value.index)).encode('utf-8'))
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode('utf-8'))
+            digest.update(repr([str(dtype) for dtype in value.dtypes]).encode('utf-8'))
+        else:
+            digest.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else repr(value.tolist()).encode('utf-8'))
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _update(digest, item)
+        digest.update(b']')
+    else:
+        digest.update(repr(value).encode('utf-8'))
+    digest.update(b'\x1f')
+
+
+def figure_hash(figure):
+    """Hash of draw function including its code, its arguments and font.
+
+    Args:
+        figure (Figure): figure to be hashed
+    Return:
+        digest (str): hex digest
+    """
+    digest = hashlib.sha1()
+    _update(digest, (figure.draw.__module__, figure.draw.__name__))
+    try:
+        digest.update(inspect.getsource(figure.draw).encode('utf-8'))
+    except (OSError, TypeError):
+        digest.update(figure.draw.__code__.co_code)
+        _update(digest, figure.draw.__code__.co_consts)
+    _update(digest, figure.kwargs)
+    _update(digest, figure.font)
+    return digest.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    # import here so that time per figure excludes start-up of worker
+    import matplotlib.pyplot
+    import seaborn
+
+
+def _render(figure):
+    start = time.perf_counter()
+    draw(figure)
+    plotting(*figure.font)[0].close('all')
+    return time.perf_counter() - start
+
+
+class FigureReport:
+    """Collect figures and render them at once over worker processes with Agg backend.
+        Hash of each figure is kept in manifest, and figure whose hash and file are unchanged is not redrawn.
+
+    Args:
+        manifest_fpath (str): path of manifest of figure hashes
+        n_workers (int): number of worker processes. Default number of cores.
+    Return:
+    """
+    def __init__(self, manifest_fpath='./figure/manifest.json', n_workers=None):
+        self.manifest_fpath = manifest_fpath
+        self.n_workers = n_workers if n_workers is not None else os.cpu_count()
+        self.figures = list()
+
+        self.manifest = dict()
+        if os.path.exists(manifest_fpath):
+            with open(manifest_fpath, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def add(self, figure):
+        """Add figure to be rendered.
+
+        Args:
+            figure (Figure): figure to be rendered
+        Return:
+        """
+        self.figures.append(figure)
+
+    def render(self, verbose=True):
+        """Render added figures. Unchanged figures are skipped.
+
+        Args:
+            verbose (bool): whether to print time per figure
+        Return:
+            timings (dict): figure path - seconds to render. None if skipped
+        """
+        start = time.perf_counter()
+        timings = dict()
+        jobs = dict()
+        for figure in self.figures:
+            fpath = figure.kwargs['fpath']
+            digest = figure_hash(figure)
+            if self.manifest.get(fpath) == digest and os.path.exists(fpath):
+                timings[fpath] = None
+            else:
+                jobs[fpath] = (figure, digest)
+
+        if jobs:
+            with ProcessPoolExecutor(
+                max_workers=min(self.n_workers, len(jobs)), mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            ) as executor:
+                futures = {fpath: executor.submit(_render, figure) for fpath, (figure, _) in jobs.items()}
+                for fpath, future in futures.items():
+                    timings[fpath] = future.result()
+                    self.manifest[fpath] = jobs[fpath][1]
+
+            with open(self.manifest_fpath + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(self.manifest_fpath + '.tmp', self.manifest_fpath)
+        self.figures = list()
+
+        if verbose:
+            for fpath, seconds in timings.items():
+                print('{:<48s} {}'.format(fpath, 'skipped' if seconds is None else '{:.2f}s'.format(seconds)))
+            print('{} rendered, {} skipped in {:.2f}s'.format(
+                len(jobs), len(timings) - len(jobs), time.perf_counter() - start
+            ))
+        return timings
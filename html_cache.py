@@ -0,0 +1,105 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Compressed raw HTML store for re-parsing crawled pages offline.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+
+class RawHTMLCache:
+    """Content-addressed, compressed store of raw HTML keyed by url.
+        Page is saved once per content under $cache_dir/objects, and index.jsonl maps url to content hash.
+        Url saved again points to latest content.
+
+    Args:
+        cache_dir (str): directory of cache
+        level (int): zlib compression level
+    Return:
+    """
+    def __init__(self, cache_dir, level=6):
+        self.cache_dir = cache_dir
+        self.level = level
+        self.object_dir = os.path.join(cache_dir, 'objects')
+        self.index_fpath = os.path.join(cache_dir, 'index.jsonl')
+        os.makedirs(self.object_dir, exist_ok=True)
+
+        self.index = dict()
+        if os.path.exists(self.index_fpath):
+            with open(self.index_fpath, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    # partial line written by crashed run. truncated so next record starts on its own line
+                    f.truncate(data.rfind(b'\n') + 1)
+                    data = data[:data.rfind(b'\n') + 1]
+
+            for line in data.decode('utf-8').splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    self.index[record['url']] = record['hash']
+
+        self.lock = threading.Lock()
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _object_fpath(self, key):
+        return os.path.join(self.object_dir, key[:2], key[2:])
+
+    def put(self, url, html):
+        """Save raw HTML of url.
+
+        Args:
+            url (str): url of page
+            html (str): page source
+        Return:
+            key (str): content hash of page
+        """
+        data = html.encode('utf-8')
+        key = hashlib.sha1(data).hexdigest()
+
+        fpath = self._object_fpath(key)
+        if not os.path.exists(fpath):
+            os.makedirs(os.path.dirname(fpath), exist_ok=True)
+            tmp_fpath = '{}.{}.tmp'.format(fpath, threading.get_ident())
+            with open(tmp_fpath, 'wb') as f:
+                f.write(zlib.compress(data, self.level))
+            os.replace(tmp_fpath, fpath)
+
+        with self.lock:
+            if self.index.get(url) != key:
+                self.index[url] = key
+                with open(self.index_fpath, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'url': url, 'hash': key}, ensure_ascii=False) + '\n')
+        return key
+
+    def get(self, url):
+        """Load raw HTML of url.
+
+        Args:
+            url (str): url of page
+        Return:
+            html (str): page source. None if not cached
+        """
+        key = self.index.get(url)
+        if key is None:
+            return None
+        with open(self._object_fpath(key), 'rb') as f:
+            return zlib.decompress(f.read()).decode('utf-8')
+
+    def urls(self):
+        """Urls in cache.
+
+        Args:
+        Return:
+            urls (list): cached urls
+        """
+        return list(self.index.keys())
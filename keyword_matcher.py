@@ -0,0 +1,122 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Match keywords in abstracts with Aho-Corasick automaton.
+"""
+
+import re
+from collections import deque
+
+import numpy as np
+from scipy import sparse
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+HANGUL_PATTERN = re.compile(r'[가-힣ㄱ-ㅎㅏ-ㅣ]')
+
+
+def normalize(text):
+    """Lower letters and collapse white spaces, so that keyword matches regardless of spacing and case.
+
+    Args:
+        text (str): keyword or abstract
+    Return:
+        text (str): normalized text
+    """
+    return WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
+def _is_latin(char):
+    return char.isalnum() and not HANGUL_PATTERN.match(char)
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over keywords. Every abstract is scanned once character by character
+        without morphological analysis, and every occurrence of every keyword is counted, including overlapping
+        and multi-word keywords, ex) both 음악치료 and 음악치료 프로그램.
+
+    Args:
+        keywords (list): keywords to be matched. column order of hit matrix
+        word_start (bool): if True, keyword of Latin letters or digits matches only at start of word,
+            ex) 'art' does not match in 'start'. Hangul keyword matches anywhere, since Korean compound noun
+            ends with keyword, ex) 음악치료 in 집단음악치료, and particles attach to the end of word.
+    Return:
+    """
+    def __init__(self, keywords, word_start=True):
+        self.keywords = list(keywords)
+        self.word_start = word_start
+        self.lengths = list()
+
+        # trie of normalized keywords. outputs are keyword ids ending at the state
+        self.goto = [dict()]
+        self.outputs = [list()]
+        for idx, keyword in enumerate(self.keywords):
+            pattern = normalize(keyword)
+            self.lengths.append(len(pattern))
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append(dict())
+                    self.outputs.append(list())
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.outputs[state].append(idx)
+
+        # failure links in breadth first order. outputs of failure state are merged
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def find(self, text):
+        """Find keywords in text.
+
+        Args:
+            text (str): text to be scanned
+        Return:
+            matches (list): list of (keyword id, start position in normalized text)
+        """
+        text = normalize(text)
+        goto, fail, outputs, lengths = self.goto, self.fail, self.outputs, self.lengths
+
+        matches = list()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for idx in outputs[state]:
+                start = end - lengths[idx] + 1
+                if self.word_start and start > 0 and _is_latin(text[start]) and _is_latin(text[start - 1]):
+                    continue
+                matches.append((idx, start))
+        return matches
+
+    def count(self, texts):
+        """Number of occurrences of each keyword in each text.
+
+        Args:
+            texts (list): texts to be scanned, ex) abstracts
+        Return:
+            hits (scipy csr_matrix): len(texts) x len(keywords) hit counts
+        """
+        rows, cols = list(), list()
+        for row, text in enumerate(texts):
+            for idx, _ in self.find(text):
+                rows.append(row)
+                cols.append(idx)
+        hits = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(texts), len(self.keywords))
+        )
+        hits.sum_duplicates()
+        return hits
@@ -0,0 +1,153 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Registry of fitted vectorizer, LDA and doc-topic matrix keyed by corpus and hyperparameters.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+import numpy as np
+from scipy import sparse
+
+# attributes of LDA saved as .npy and memory-mapped on load instead of pickled
+LDA_ARRAYS = ['components_', 'exp_dirichlet_component_']
+
+
+def model_key(corpus_version, params):
+    """Key of model from version of corpus(dataset, tokenizer and user dictionary) and hyperparameters.
+
+    Args:
+        corpus_version (str): version of TokenCorpus
+        params (dict): hyperparameters of vectorizer and LDA
+    Return:
+        key (str): hex digest
+    """
+    data = json.dumps({'corpus': corpus_version, 'params': params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class ModelRegistry:
+    """Fitted models saved under $root/$key. Small objects are pickled and large arrays are saved as .npy,
+        which are memory-mapped on load, so a trained model is reloaded without refitting.
+
+    Args:
+        root (str): directory of registry
+    Return:
+    """
+    def __init__(self, root='./data/models'):
+        self.root = root
+
+    def path(self, key):
+        """Directory of model.
+
+        Args:
+            key (str): key of model
+        Return:
+            dpath (str): directory of model
+        """
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key):
+        return os.path.exists(os.path.join(self.path(key), 'meta.json'))
+
+    def save(self, key, vectorizer, lda, doc2vec, doc_topic, params=None):
+        """Save fitted models. Entry of same key is replaced.
+
+        Args:
+            key (str): key of model. see model_key
+            vectorizer (object): fitted vectorizer, ex) CorpusVectorizer
+            lda (LatentDirichletAllocation): fitted LDA
+            doc2vec (scipy sparse matrix): doc-term matrix LDA is fitted on
+            doc_topic (numpy array): topic distribution of each document
+            params (dict): hyperparameters, saved for reference
+        Return:
+        """
+        dpath = self.path(key)
+        tmp_dpath = dpath + '.tmp'
+        if os.path.exists(tmp_dpath):
+            shutil.rmtree(tmp_dpath)
+        os.makedirs(tmp_dpath)
+
+        doc2vec = sparse.csr_matrix(doc2vec)
+        arrays = {
+            'doc_topic': np.asarray(doc_topic),
+            'doc2vec_data': doc2vec.data,
+            'doc2vec_indices': doc2vec.indices,
+            'doc2vec_indptr': doc2vec.indptr
+        }
+        for name in LDA_ARRAYS:
+            arrays['lda' + name] = getattr(lda, name)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dpath, name + '.npy'), array)
+
+        # large arrays are detached while pickling
+        detached = {name: getattr(lda, name) for name in LDA_ARRAYS}
+        try:
+            for name in LDA_ARRAYS:
+                setattr(lda, name, None)
+            with open(os.path.join(tmp_dpath, 'models.pkl'), 'wb') as f:
+                pickle.dump({'vectorizer': vectorizer, 'lda': lda}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            for name, array in detached.items():
+                setattr(lda, name, array)
+
+        with open(os.path.join(tmp_dpath, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'params': params, 'shape': list(doc2vec.shape), 'created': time.time()}, f)
+
+        if os.path.exists(dpath):
+            shutil.rmtree(dpath)
+        os.replace(tmp_dpath, dpath)
+
+    def load(self, key, mmap=True):
+        """Load models saved by save.
+
+        Args:
+            key (str): key of model
+            mmap (bool): whether to memory-map large arrays instead of reading
+        Return:
+            vectorizer (object): fitted vectorizer
+            lda (LatentDirichletAllocation): fitted LDA
+            doc2vec (scipy csr_matrix): doc-term matrix
+            doc_topic (numpy array): topic distribution of each document
+        """
+        dpath = self.path(key)
+        mmap_mode = 'r' if mmap else None
+
+        def load_array(name):
+            return np.load(os.path.join(dpath, name + '.npy'), mmap_mode=mmap_mode)
+
+        with open(os.path.join(dpath, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(dpath, 'models.pkl'), 'rb') as f:
+            models = pickle.load(f)
+
+        lda = models['lda']
+        for name in LDA_ARRAYS:
+            setattr(lda, name, load_array('lda' + name))
+        doc2vec = sparse.csr_matrix(
+            (load_array('doc2vec_data'), load_array('doc2vec_indices'), load_array('doc2vec_indptr')),
+            shape=tuple(meta['shape']), copy=False
+        )
+        return models['vectorizer'], lda, doc2vec, load_array('doc_topic')
+
+    def entries(self):
+        """Meta of every registered model.
+
+        Args:
+        Return:
+            entries (list): list of meta dict with key, params, shape and created time
+        """
+        entries = list()
+        if not os.path.exists(self.root):
+            return entries
+        for key in sorted(os.listdir(self.root)):
+            if key in self:
+                with open(os.path.join(self.path(key), 'meta.json'), 'r', encoding='utf-8') as f:
+                    entries.append(json.load(f))
+        return entries
@@ -5,16 +5,20 @@ Date: 2020-06-26 (Last Modified)
 Objective: EDA. 
 """
 
-from ast import literal_eval
-from collections import Counter
+import os
+
 import pandas as pd
-from wordcloud import WordCloud
-from konlpy.tag import Komoran
-from tqdm import tqdm
 
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
-import seaborn as sns
+from cooccurrence import CooccurrenceEngine
+from corpus import cached_corpus
+from figure_report import Figure, FigureReport, barplot, heatmap, wordcloud
+from keyword_matcher import KeywordMatcher
+from startup import StartupReport, plotting
+from storage import load_dataframe
+from term_index import TermIndex, fingerprint
+from term_stats import TermStatistics, document_keys
+from token_cache import TokenCache
+from tokenizer import BatchTokenizer
 
 class ArticleNLP:
     """ Basic Natural Language Processing. 
@@ -22,37 +26,123 @@ class ArticleNLP:
 
     Args:
         fpath (str): local path to load dataset
+        backend (str): tokenizer of abstract. see tokenizer.BACKENDS
     Return:
     """
-    def __init__(self, fpath):
-        self.dataframe = pd.read_csv(fpath, encoding='utf-8')
-        self.dataframe.keyword = self.dataframe.keyword.apply(literal_eval)
+    FONT = ('./static/fonts/AppleSDGothicNeo.ttc', 18)
+
+    def __init__(self, fpath, backend='komoran'):
+        self.backend = backend
+        self.fpath = fpath
+        self.report = StartupReport('ArticleNLP')
+
+        self._dataframe = None
+        self._tokenizer = None
+        self._token_cache = None
+        self._plotting = None
+        self.renderer = None
+        self.nouns = None
+        self._corpus = None
+        self.index = None
+        self.stats = dict()
+        self.hits = None
+        self.hit_columns = None
+
+    @property
+    def dataframe(self):
+        """ Dataset loaded on first access. """
+        if self._dataframe is None:
+            with self.report.measure('dataframe'):
+                self._dataframe = load_dataframe(self.fpath, columns=['year', 'keyword', 'abstract'])
+        return self._dataframe
+
+    @property
+    def tokenizer(self):
+        """ Tokenizer of $backend created on first access. JVM starts on first text. """
+        if self._tokenizer is None:
+            with self.report.measure('tokenizer'):
+                self._tokenizer = BatchTokenizer('./data/user_dic.tsv', backend=self.backend)
+        return self._tokenizer
+
+    @property
+    def token_cache(self):
+        """ Token cache opened on first access. """
+        if self._token_cache is None:
+            with self.report.measure('token_cache'):
+                self._token_cache = TokenCache(
+                    './data/token_cache.sqlite', self.tokenizer.nouns, self.tokenizer.version(),
+                    tokenize_batch=self.tokenizer.nouns_many
+                )
+        return self._token_cache
+
+    def plotting(self):
+        """ matplotlib and seaborn with korean font. Imported and set on first plot.
 
-        plt.style.use('seaborn-darkgrid')
+        Args:
+        Return:
+            plt (module): matplotlib.pyplot
+            sns (module): seaborn
+        """
+        if self._plotting is None:
+            with self.report.measure('plotting'):
+                self._plotting = plotting(*self.FONT)
+        return self._plotting
 
-        font_name = './static/fonts/AppleSDGothicNeo.ttc'
-        font_family = fm.FontProperties(fname=font_name).get_name()
+    def draw(self, draw, **kwargs):
+        """ Draw figure now, or add to $renderer to be rendered in parallel if renderer is set.
 
-        plt.rcParams['font.family'] = font_family
-        plt.rcParams['font.size'] = 18
+        Args:
+            draw (function): drawing function of figure_report, ex) heatmap
+            kwargs (dict): arguments of $draw including fpath
+        Return:
+        """
+        figure = Figure(draw, kwargs, self.FONT)
+        if self.renderer is not None:
+            self.renderer.add(figure)
+        else:
+            plt, sns = self.plotting()
+            draw(plt, sns, **kwargs)
 
-        self.komoran = Komoran(userdic='./data/user_dic.tsv')
+    def term_statistics(self, field):
+        """ Persisted term frequency of 'keyword' or 'noun' field. Only articles not counted yet are analyzed.
+            Statistics are recounted if an article counted before is removed from dataset,
+            or nouns come from another version of tokenizer or user dictionary.
+
+        Args:
+            field (str): 'keyword' or 'noun'
+        Return:
+            stats (TermStatistics): term frequency overall and per year
+        """
+        if field not in self.stats:
+            fpath = './data/term_stats_{}.json'.format(field if field == 'keyword' else field + '-' + self.backend)
+            keys = document_keys(self.dataframe.year, self.dataframe.keyword, self.dataframe.abstract)
+            version = '' if field == 'keyword' else self.token_cache.version
+            stats = TermStatistics.load(fpath)
+            if stats.version != version or not stats.keys <= set(keys):
+                stats = TermStatistics(version)
+
+            new = [idx for idx, key in enumerate(keys) if key not in stats.keys]
+            if new:
+                rows = self.dataframe.iloc[new]
+                if field == 'keyword':
+                    docs = rows.keyword
+                elif self.nouns is not None:
+                    docs = [self.nouns[idx] for idx in new]
+                else:
+                    docs = self.token_cache.tokenize_many(list(rows.abstract))
+                stats.update([keys[idx] for idx in new], rows.year, docs)
+                stats.save(fpath)
+            self.stats[field] = stats
+        return self.stats[field]
 
-    
     def count_keyword(self):
-        """ Count number of keyword using collections.Counter
+        """ Count number of keyword from persisted term statistics
 
         Args:
         Return:
             counter (Counter): counter for keywords
         """
-        keywords = list()
-        for keyword in self.dataframe.keyword:
-            keywords += keyword
-
-        counter = Counter(keywords)        
-
-        return counter
+        return self.term_statistics('keyword').counter()
 
     def keyword_barplot(self, n=-1):
         """ Draw Barplot based on frequency of keyword. Save to local.
@@ -67,13 +157,10 @@ class ArticleNLP:
         else:
             keyword_freq = dict(counter.most_common())
 
-        plt.figure(figsize=(16, 9))
-        sns.barplot(x=list(keyword_freq.keys()), y=list(keyword_freq.values()))
-        plt.xticks([])
-        plt.xlabel('Keyword')
-        plt.ylabel('Keyword Frequency')
-        plt.title('Frequency of Keyword Distribution({})'.format(n if n != -1 else 'ALL'))
-        plt.savefig('./figure/keyword_barplot.png')
+        self.draw(barplot, fpath='./figure/keyword_barplot.png',
+                  x=list(keyword_freq.keys()), y=list(keyword_freq.values()), xticks=False,
+                  xlabel='Keyword', ylabel='Keyword Frequency',
+                  title='Frequency of Keyword Distribution({})'.format(n if n != -1 else 'ALL'))
 
     def keyword_wordcloud(self, n):
         """ Draw wordcloud based on frequency of keyword. Save to local.
@@ -84,16 +171,22 @@ class ArticleNLP:
         """
         counter = self.count_keyword()
 
-        plt.figure(figsize=(12, 12))
-        wc = WordCloud(font_path='./static/fonts/NanumGothic.ttf', width=800, height=800, random_state=2020, background_color='white')
-        wc.generate_from_frequencies(dict(counter.most_common(n)))
-        plt.imshow(wc)
-        plt.xticks([])
-        plt.yticks([])
-        plt.title('WordCloud of top 100 keywords')
-        plt.tight_layout()
-        plt.savefig('./figure/keyword_wordcloud.png')
+        self.draw(wordcloud, fpath='./figure/keyword_wordcloud.png',
+                  frequencies=dict(counter.most_common(n)), title='WordCloud of top 100 keywords')
     
+    def keyword_year_table(self, n=-1):
+        """ Frequency of keyword among years from posting lists of term index.
+
+        Args:
+            n (int): number of most frequent keywords. all keywords if -1.
+        Return:
+            df (pandas DataFrame): keyword(index in order of frequency) by year(column) frequency table
+        """
+        counter = self.count_keyword()
+        keywords = [k for k, _ in (counter.most_common(n) if n != -1 else counter.most_common())]
+
+        return self.term_index().year_table(keywords, 'keyword')
+
     def keyword_year(self, n):
         """ Draw heatmap based on frequency of keyword among years. Save to local.
 
@@ -101,24 +194,29 @@ class ArticleNLP:
             n (int): number of most frequent keywords to be plotted.
         Return:
         """
-        counter = self.count_keyword()
-        keywords = [k for k, _ in counter.most_common(n)]
-
-        years = range(self.dataframe.year.min(), self.dataframe.year.max() + 1)
-        df = pd.DataFrame(index=keywords, columns=years)
-        df = df.fillna(0)
-
-        for idx in tqdm(range(len(self.dataframe))):
-            y = self.dataframe.loc[idx, 'year']
-            ks = self.dataframe.loc[idx, 'keyword']
-            for k in ks:
-                if k in keywords:
-                    df.loc[k, y] = df.loc[k, y] + 1
+        df = self.keyword_year_table(n)
         
-        plt.figure(figsize=(20, 32))
-        sns.heatmap(df, annot=True)
-        plt.title('Top {} Keywords occur in Each Year.'.format(n))
-        plt.savefig('./figure/keyword_year.png')
+        self.draw(heatmap, fpath='./figure/keyword_year.png', df=df, figsize=(20, 32),
+                  title='Top {} Keywords occur in Each Year.'.format(n))
+
+    def keyword_cooccurence_table(self, n=-1, measure=None):
+        """ Frequency of keyword cooccurence from sparse document-keyword matrix.
+
+        Args:
+            n (int): number of most frequent keywords. all keywords if -1.
+            measure (str): None for frequency, 'pmi' or 'npmi' for weighted cooccurence
+        Return:
+            cooccurrence (scipy csr_matrix): keyword by keyword cooccurence
+            keywords (list): keywords of rows and columns in order of frequency
+        """
+        counter = self.count_keyword()
+        keywords = [k for k, _ in (counter.most_common(n) if n != -1 else counter.most_common())]
+
+        engine = CooccurrenceEngine(self.dataframe.keyword)
+        if measure is None:
+            return engine.matrix(keywords, binary=False)
+        cooccurrence, keywords = engine.matrix(keywords, binary=True)
+        return engine.weight(cooccurrence, *engine.document_frequency(keywords), measure=measure), keywords
 
     def keyword_cooccurence(self, n):
         """ Draw heatmap based on frequency of keyword cooccurence. Save to local.
@@ -127,39 +225,83 @@ class ArticleNLP:
             n (int): number of most frequent keywords to be plotted.
         Return:
         """
-        counter = self.count_keyword()
-        keywords = [k for k, _ in counter.most_common(n)]
+        df = CooccurrenceEngine.to_frame(*self.keyword_cooccurence_table(n))
+        
+        self.draw(heatmap, fpath='./figure/keyword_cooccurence.png', df=df, figsize=(32, 32),
+                  title='Top {} Keywords Cooccurence'.format(n))
 
-        df = pd.DataFrame(index=keywords, columns=keywords)
-        df = df.fillna(0)
+    def abstract_nouns(self):
+        """ Nouns of each abstract. Each abstract is analyzed once through persistent token cache.
 
-        for idx in tqdm(range(len(self.dataframe))):
-            ks = self.dataframe.loc[idx, 'keyword']
-            for src in ks:
-                for dst in ks:
-                    if src in keywords and dst in keywords:
-                        df.loc[src, dst] = df.loc[src, dst] + 1
-        
-        plt.figure(figsize=(32, 32))
-        sns.heatmap(df, annot=True)
-        plt.title('Top {} Keywords Cooccurence'.format(n))
-        plt.savefig('./figure/keyword_cooccurence.png')
+        Args:
+        Return:
+            nouns (list): list of nouns per abstract
+        """
+        if self.nouns is None:
+            self.nouns = self.token_cache.tokenize_many(list(self.dataframe.abstract))
+        return self.nouns
+
+    def corpus(self):
+        """ Nouns of abstracts as memory-mapped token ids. Rebuilt only if dataset or tokenizer is changed.
+
+        Args:
+        Return:
+            corpus (TokenCorpus): corpus of abstract nouns
+        """
+        if self._corpus is None:
+            version = fingerprint([self.token_cache.version], self.dataframe.abstract)
+            self._corpus = cached_corpus('./data/corpus-{}'.format(self.backend), version, self.abstract_nouns)
+        return self._corpus
+
+    def term_index(self, fpath=None):
+        """ Inverted index of keywords and abstract nouns with year. Persisted index is reused while dataset and tokenizer are unchanged.
+
+        Args:
+            fpath (str): local path of persisted index. Default ./data/term_index-$backend.npz
+        Return:
+            index (TermIndex): index with 'keyword' and 'noun' fields
+        """
+        if fpath is None:
+            fpath = './data/term_index-{}.npz'.format(self.backend)
+        if self.index is None:
+            version = fingerprint(
+                [self.token_cache.version], self.dataframe.year, self.dataframe.keyword, self.dataframe.abstract
+            )
+            if os.path.exists(fpath):
+                index = TermIndex.load(fpath)
+                if index.version == version:
+                    self.index = index
+            if self.index is None:
+                self.index = TermIndex(
+                    {'keyword': self.dataframe.keyword, 'noun': self.corpus()}, self.dataframe.year, version
+                )
+                self.index.save(fpath)
+        return self.index
+
+    def keyword_hits(self, keywords):
+        """ Hit counts of keywords in each abstract, including multi-word keywords.
+            Aho-Corasick automaton over the whole keyword vocabulary scans every abstract once on first call.
+
+        Args:
+            keywords (list): keywords of columns
+        Return:
+            hits (scipy csr_matrix): abstract by keyword hit counts
+        """
+        if self.hits is None:
+            matcher = KeywordMatcher(list(self.count_keyword()))
+            self.hits = matcher.count(list(self.dataframe.abstract.fillna('')))
+            self.hit_columns = {keyword: idx for idx, keyword in enumerate(matcher.keywords)}
+        return self.hits[:, [self.hit_columns[keyword] for keyword in keywords]]
 
     def count_abstract(self):
-        """ Count number of noun in abstract using collections.Counter
-            KoNLPy to extract nouns
+        """ Count number of noun in abstract from persisted term statistics
+            KoNLPy to extract nouns of newly added abstracts
 
         Args:
         Return:
             counter (Counter): counter for nouns
         """
-        nouns = list()
-        for abstract in self.dataframe.abstract:
-            for n in self.komoran.nouns(abstract):
-                nouns.append(n) if len(n) > 1 else None
-        
-        counter = Counter(nouns)
-        return counter 
+        return self.term_statistics('noun').counter(min_length=2)
 
     def abstract_wordcloud(self, n):
         """ Draw wordcloud based on frequency of noun in abstract. Save to local.
@@ -170,15 +312,8 @@ class ArticleNLP:
         """
         counter = self.count_abstract()
 
-        plt.figure(figsize=(12, 12))
-        wc = WordCloud(font_path='./static/fonts/NanumGothic.ttf', width=800, height=800, random_state=2020, background_color='white')
-        wc.generate_from_frequencies(dict(counter.most_common(n)))
-        plt.imshow(wc)
-        plt.xticks([])
-        plt.yticks([])
-        plt.title('WordCloud of top 100 nouns on abstrat')
-        plt.tight_layout()
-        plt.savefig('./figure/abstract_wordcloud.png')
+        self.draw(wordcloud, fpath='./figure/abstract_wordcloud.png',
+                  frequencies=dict(counter.most_common(n)), title='WordCloud of top 100 nouns on abstrat')
 
     def abstract_year(self, n, keyword):
         """ Draw heatmap based on frequency of nouns or keywords in abstract among years. Save to local.
@@ -195,56 +330,74 @@ class ArticleNLP:
 
         words = [k for k, _ in counter.most_common(n)]
 
-        years = range(self.dataframe.year.min(), self.dataframe.year.max() + 1)
-        df = pd.DataFrame(index=words, columns=years)
-        df = df.fillna(0)
+        if keyword:
+            years = range(self.dataframe.year.min(), self.dataframe.year.max() + 1)
+            hits = pd.DataFrame(self.keyword_hits(words).toarray(), columns=words)
+            df = hits.groupby(self.dataframe.year.values).sum().reindex(years, fill_value=0).T
+        else:
+            df = self.term_index().year_table(words, 'noun')
 
-        for idx in tqdm(range(len(self.dataframe))):
-            y = self.dataframe.loc[idx, 'year']
-            abstracts = self.dataframe.loc[idx, 'abstract']
-            for noun in self.komoran.nouns(abstracts):
-                if noun in words:
-                    df.loc[noun, y] = df.loc[noun, y] + 1
-        
-        plt.figure(figsize=(20, 32))
-        sns.heatmap(df, annot=True)
-        plt.title('Top {} {} occur in Each Year.'.format(n, 'Keyword in Abstract' if keyword else 'Noun in Abstract'))
-        plt.savefig('./figure/abstract_year_{}.png'.format('keyword' if keyword else 'noun'))
+        self.draw(heatmap, fpath='./figure/abstract_year_{}.png'.format('keyword' if keyword else 'noun'), df=df,
+                  figsize=(20, 32),
+                  title='Top {} {} occur in Each Year.'.format(n, 'Keyword in Abstract' if keyword else 'Noun in Abstract'))
 
-    def abstract_cooccurence(self, n, keyword):
-        """ Draw heatmap based on frequency of nouns or keywords in abstract cooccurence. Save to local.
+    def abstract_cooccurence_table(self, n, keyword, window=None, measure=None):
+        """ Cooccurence of nouns or keywords in abstract from sparse document-term matrix.
 
         Args:
-            n (int): number of most frequent words to be plotted.
-            keyword (bool): if True then use keyword else use nouns
+            n (int): number of most frequent words. all words if -1.
+            keyword (bool): if True then use keywords matched in abstract else use nouns
+            window (int): if given, count words at most $window nouns apart instead of in the same abstract.
+                keywords are counted only if they are nouns
+            measure (str): None for frequency, 'pmi' or 'npmi' for weighted cooccurence
         Return:
+            cooccurrence (scipy csr_matrix): word by word cooccurence
+            words (list): words of rows and columns in order of frequency
         """
         if keyword:
             counter = self.count_keyword()
         else:
             counter = self.count_abstract()
 
-        words = [k for k, _ in counter.most_common(n)]
-        
-        df = pd.DataFrame(index=words, columns=words)
-        df = df.fillna(0)
-
-        for idx in tqdm(range(len(self.dataframe))):
-            abstracts = self.dataframe.loc[idx, 'abstract']
-            nouns = self.komoran.nouns(abstracts)
-            for src in words:
-                for dst in words:
-                    if src in nouns and dst in nouns:
-                        df.loc[src, dst] = df.loc[src, dst] + 1
+        words = [k for k, _ in (counter.most_common(n) if n != -1 else counter.most_common())]
+
+        if keyword and window is None:
+            matrix = self.keyword_hits(words)
+            matrix.data[:] = 1
+            cooccurrence = (matrix.T @ matrix).tocsr()
+            # keyword hits of each word do not depend on other words, so diagonal is corpus-level document frequency
+            total, marginal = matrix.shape[0], cooccurrence.diagonal()
+        else:
+            engine = CooccurrenceEngine(self.corpus())
+            if window is None:
+                cooccurrence, words = engine.matrix(words, binary=True)
+                if measure is not None:
+                    total, marginal = engine.document_frequency(words)
+            else:
+                cooccurrence, words = engine.window_matrix(window, words)
+                if measure is not None:
+                    total, marginal = engine.window_frequency(window, words)
+        if measure is not None:
+            cooccurrence = CooccurrenceEngine.weight(cooccurrence, total, marginal, measure)
+        return cooccurrence, words
+
+    def abstract_cooccurence(self, n, keyword):
+        """ Draw heatmap based on frequency of nouns or keywords in abstract cooccurence. Save to local.
+
+        Args:
+            n (int): number of most frequent words to be plotted.
+            keyword (bool): if True then use keyword else use nouns
+        Return:
+        """
+        df = CooccurrenceEngine.to_frame(*self.abstract_cooccurence_table(n, keyword))
         
-        plt.figure(figsize=(32, 32))
-        sns.heatmap(df, annot=True)
-        plt.title('Top {} {} in Abstract Cooccurence'.format(n, 'Keyword' if keyword else 'Noun'))
-        plt.savefig('./figure/abstract_cooccurence_{}.png'.format('keyword' if keyword else 'noun'))
+        self.draw(heatmap, fpath='./figure/abstract_cooccurence_{}.png'.format('keyword' if keyword else 'noun'), df=df,
+                  figsize=(32, 32), title='Top {} {} in Abstract Cooccurence'.format(n, 'Keyword' if keyword else 'Noun'))
 
 
 if __name__ == '__main__':
-    nlp = ArticleNLP('./data/keyword-abstract.csv')
+    nlp = ArticleNLP('./data/keyword-abstract.parquet')
+    nlp.renderer = FigureReport()
     nlp.keyword_barplot()
     counter_keyword = nlp.count_keyword()
     print(dict(counter_keyword.most_common(100)))
@@ -259,4 +412,5 @@ if __name__ == '__main__':
     nlp.abstract_year(50, keyword=False)
     nlp.abstract_cooccurence(50, keyword=True)
     nlp.abstract_cooccurence(50, keyword=False)
-
+    nlp.renderer.render()
+    nlp.report.report()
@@ -0,0 +1,182 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Online LDA over streamed mini-batches of token corpus with checkpoint.
+"""
+
+import os
+import pickle
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+
+class OnlineTopicModel:
+    """LDA updated by mini-batches with partial_fit. Only one mini-batch of doc-term matrix is in memory at once,
+        and vocabulary is fixed or hashed in advance, so memory is bounded by $batch_size and number of features.
+        Documents already learned are remembered by their keys, so new articles are folded in without refit.
+
+    Args:
+        n_components (int): number of topics
+        vocabulary (list): fixed vocabulary. terms not in vocabulary are ignored. hashed vocabulary if None
+        n_features (int): number of hashed features. used if $vocabulary is None
+        min_length (int): minimum length of term
+        batch_size (int): number of documents per partial_fit
+        total_samples (int): estimated total number of documents, used for learning rate of online LDA
+        random_state (int): random state of LDA
+    Return:
+    """
+    def __init__(self, n_components, vocabulary=None, n_features=2 ** 16, min_length=2, batch_size=256,
+                 total_samples=1e6, random_state=2020):
+        from sklearn.decomposition import LatentDirichletAllocation
+
+        self.vocabulary = None if vocabulary is None else {term: idx for idx, term in enumerate(vocabulary)}
+        self.n_features = n_features if vocabulary is None else len(vocabulary)
+        self.min_length = min_length
+        self.batch_size = batch_size
+        self.seen = set()
+        self.n_batches = 0
+
+        self.lda = LatentDirichletAllocation(
+            n_components=n_components, learning_method='online', batch_size=batch_size,
+            total_samples=total_samples, random_state=random_state
+        )
+
+    def column(self, term):
+        """Feature column of term.
+
+        Args:
+            term (str): term
+        Return:
+            column (int): column of term, -1 if ignored
+        """
+        if len(term) < self.min_length:
+            return -1
+        if self.vocabulary is not None:
+            return self.vocabulary.get(term, -1)
+        return zlib.crc32(term.encode('utf-8')) % self.n_features
+
+    def feature_names(self, corpus):
+        """Name of each feature. With hashed vocabulary, first term of corpus in each column.
+
+        Args:
+            corpus (TokenCorpus): corpus of terms
+        Return:
+            names (list): name per feature column, empty string if no term
+        """
+        if self.vocabulary is not None:
+            return sorted(self.vocabulary, key=self.vocabulary.get)
+        names = [''] * self.n_features
+        for term in corpus.terms:
+            column = self.column(term)
+            if column >= 0 and not names[column]:
+                names[column] = term
+        return names
+
+    def _batches(self, corpus, columns, unseen):
+        for start in range(0, len(unseen), self.batch_size):
+            docs = unseen[start:start + self.batch_size]
+            rows, cols = list(), list()
+            for row, doc in enumerate(docs):
+                doc_cols = columns[corpus.ids[corpus.indptr[doc]:corpus.indptr[doc + 1]]]
+                doc_cols = doc_cols[doc_cols >= 0]
+                rows.append(np.full(len(doc_cols), row))
+                cols.append(doc_cols)
+            rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+            cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+            batch = sparse.csr_matrix(
+                (np.ones(len(rows)), (rows, cols)), shape=(len(docs), self.n_features)
+            )
+            batch.sum_duplicates()
+            yield docs, batch
+
+    def check(self, n_components, vocabulary=None, batch_size=256):
+        """Check that model resumed from checkpoint has same hyperparameters as requested.
+
+        Args:
+            n_components (int): number of topics
+            vocabulary (list): fixed vocabulary. hashed vocabulary if None
+            batch_size (int): number of documents per partial_fit
+        Return:
+        """
+        current = sorted(self.vocabulary, key=self.vocabulary.get) if self.vocabulary is not None else None
+        requested = list(vocabulary) if vocabulary is not None else None
+        different = [
+            name for name, mine, theirs in [
+                ('n_components', self.lda.n_components, n_components),
+                ('vocabulary', current, requested),
+                ('batch_size', self.batch_size, batch_size)
+            ] if mine != theirs
+        ]
+        if different:
+            raise ValueError('{} differ from checkpoint. remove checkpoint to start over'.format(', '.join(different)))
+
+    def partial_fit(self, corpus, keys=None, checkpoint_fpath=None, checkpoint_every=10, verbose=False):
+        """Learn documents of corpus not learned yet, one mini-batch at a time.
+
+        Args:
+            corpus (TokenCorpus): streamed corpus, ex) memory-mapped
+            keys (list): identity of each document, ex) term_stats.document_keys. Default position in corpus
+            checkpoint_fpath (str): if given, model is saved every $checkpoint_every mini-batches and at the end
+            checkpoint_every (int): number of mini-batches between checkpoints
+            verbose (bool): whether to print progress per mini-batch
+        Return:
+            n_learned (int): number of newly learned documents
+        """
+        columns = np.array([self.column(term) for term in corpus.terms], dtype=np.int64)
+
+        keys = [str(doc) for doc in range(len(corpus))] if keys is None else list(keys)
+        if len(keys) != len(corpus):
+            raise ValueError('{} keys for {} documents'.format(len(keys), len(corpus)))
+        unseen = [doc for doc, key in enumerate(keys) if key not in self.seen]
+
+        for docs, batch in self._batches(corpus, columns, unseen):
+            self.lda.partial_fit(batch)
+            self.seen.update(keys[doc] for doc in docs)
+            self.n_batches += 1
+            if verbose:
+                print('batch {:5d}: {:6d} documents learned'.format(self.n_batches, len(self.seen)))
+            if checkpoint_fpath is not None and self.n_batches % checkpoint_every == 0:
+                self.save(checkpoint_fpath)
+        if checkpoint_fpath is not None and unseen:
+            self.save(checkpoint_fpath)
+        return len(unseen)
+
+    def transform(self, corpus):
+        """Topic distribution of every document, computed by mini-batches.
+
+        Args:
+            corpus (TokenCorpus): corpus to be transformed
+        Return:
+            doc_topic (numpy array): n_docs x n_components
+        """
+        columns = np.array([self.column(term) for term in corpus.terms], dtype=np.int64)
+        doc_topic = np.zeros((len(corpus), self.lda.n_components))
+        for docs, batch in self._batches(corpus, columns, list(range(len(corpus)))):
+            doc_topic[docs] = self.lda.transform(batch)
+        return doc_topic
+
+    def save(self, fpath):
+        """Save checkpoint.
+
+        Args:
+            fpath (str): path to save
+        Return:
+        """
+        with open(fpath + '.tmp', 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(fpath + '.tmp', fpath)
+
+    @staticmethod
+    def load(fpath):
+        """Load checkpoint saved by save.
+
+        Args:
+            fpath (str): path to load
+        Return:
+            model (OnlineTopicModel): loaded model
+        """
+        with open(fpath, 'rb') as f:
+            return pickle.load(f)
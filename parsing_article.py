@@ -0,0 +1,237 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Parse RISS article detail page. Fast lxml parser verified against BeautifulSoup parser.
+"""
+
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+
+import numpy as np
+
+
+INFO_DETAIL_SELECTOR = '#soptionview > div > div.thesisInfo > div.infoDetail > div.infoDetailL > ul > li'
+
+
+def _has_class(name):
+    return 'contains(concat(" ", normalize-space(@class), " "), " {} ")'.format(name)
+
+
+# compiled once. same elements as selectors of BeautifulSoup parser
+INFO_DETAIL_XPATH = etree.XPath(
+    '//*[@id="soptionview"]/div/div[{}]/div[{}]/div[{}]/ul/li'.format(
+        _has_class('thesisInfo'), _has_class('infoDetail'), _has_class('infoDetailL')
+    )
+)
+KEY_XPATH = etree.XPath('.//span[{}]'.format(_has_class('strong')))
+VALUE_XPATH = etree.XPath('.//div')
+INNER_CONT_XPATH = etree.XPath('//div[{}]'.format(_has_class('innerCont')))
+INNER_TITLE_XPATH = etree.XPath('.//h3[{}]'.format(_has_class('tit')))
+CONTENT_XPATH = etree.XPath('.//div[{}]/div'.format(_has_class('content')))
+CONTENT_TITLE_XPATH = etree.XPath('.//p[{}]'.format(_has_class('title')))
+CONTENT_TEXT_XPATH = etree.XPath('.//div[{}]'.format(_has_class('text')))
+PARAGRAPH_XPATH = etree.XPath('.//p')
+
+# parser never reads script and style, so they are removed before building tree
+SCRIPT_PATTERN = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def _build_article(items, abstract):
+    """Dispatch (key, value) of infoDetailL into article record.
+
+    Args:
+        items (list): list of (key, value)
+        abstract (str): korean abstract. np.nan if not exists
+    Return:
+        article (dict): column-value dictionary except title
+    """
+    author = np.nan
+    org = '한국음악치료학회'
+    name = '한국음악치료학회지'
+    volno = np.nan
+    year = np.nan
+    lang = np.nan
+    keyword = np.nan
+    kdc = np.nan
+    kci = np.nan
+    media = '학술저널'
+    page = np.nan
+    citation = np.nan
+    link = np.nan
+    loc = np.nan
+
+    for key, value in items:
+        if key == '저자':
+            author = value
+        elif key == '발행기관':
+            org = value
+        elif key == '학술지명':
+            name = value
+        elif key == '권호사항':
+            volno = ' '.join(value.split())
+        elif key == '발행연도':
+            year = value
+        elif key == '작성언어':
+            lang = value
+        elif key == '주제어':
+            keyword = ' '.join(value.split())
+        elif key == 'KDC':
+            kdc = value
+        elif key == '등재정보':
+            kci = value
+        elif key == '자료형태':
+            media = value
+        elif key == '수록면':
+            page = value
+        elif key == 'KCI 피인용지수' or key == 'KCI 피인용횟수':
+            citation = value
+        elif key == '제공처':
+            link = value
+        elif key == '소장기관':
+            loc = value
+        else:
+            print('*********New Key: {:s}*********'.format(key))
+
+    article = {
+        'author': author, 'organization': org, 'name': name, 'volno': volno, 'year': year, 'language': lang,
+        'keyword': keyword, 'kdc': kdc, 'kci': kci, 'media': media, 'page': page, 'citation': citation,
+        'link': link, 'abstract': abstract, 'location': loc
+    }
+    return article
+
+
+def parse_article_bs4(html):
+    """Parse article detail page with BeautifulSoup. Reference parser.
+
+    Args:
+        html (str): page source of article detail page
+    Return:
+        article (dict): column-value dictionary except title
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    items = list()
+    for element in soup.select(INFO_DETAIL_SELECTOR):
+        key = element.find('span', 'strong').get_text().strip()
+        value = element.find('div').get_text().strip()
+        items.append((key, value))
+
+    abstract = np.nan
+    additionals = soup.find_all('div', 'innerCont')
+    for addition in additionals:
+        if addition.find('h3', 'tit').get_text().strip() == '부가정보':
+            contents = addition.select('div.content > div')
+            for content in contents:
+                if content.find('p', 'title').get_text().strip() == '국문 초록 (Abstract)':
+                    abstract = content.find_all('div', 'text')[1].find('p').get_text().strip()
+                    break
+
+    return _build_article(items, abstract)
+
+
+def parse_article_lxml(html):
+    """Parse article detail page with lxml. Only infoDetailL items and innerCont blocks are visited.
+
+    Args:
+        html (str): page source of article detail page
+    Return:
+        article (dict): column-value dictionary except title
+    """
+    html = SCRIPT_PATTERN.sub('', html)
+    if not html.strip():
+        return _build_article([], np.nan)
+    root = lxml.html.document_fromstring(html)
+
+    items = list()
+    for element in INFO_DETAIL_XPATH(root):
+        key = KEY_XPATH(element)[0].text_content().strip()
+        value = VALUE_XPATH(element)[0].text_content().strip()
+        items.append((key, value))
+
+    abstract = np.nan
+    for addition in INNER_CONT_XPATH(root):
+        if INNER_TITLE_XPATH(addition)[0].text_content().strip() == '부가정보':
+            for content in CONTENT_XPATH(addition):
+                if CONTENT_TITLE_XPATH(content)[0].text_content().strip() == '국문 초록 (Abstract)':
+                    abstract = PARAGRAPH_XPATH(CONTENT_TEXT_XPATH(content)[1])[0].text_content().strip()
+                    break
+
+    return _build_article(items, abstract)
+
+
+PARSERS = {'bs4': parse_article_bs4, 'lxml': parse_article_lxml}
+
+
+def parse_article(html, backend='lxml'):
+    """Parse article detail page.
+
+    Args:
+        html (str): page source of article detail page
+        backend (str): 'lxml' or 'bs4'
+    Return:
+        article (dict): column-value dictionary except title
+    """
+    return PARSERS[backend](html)
+
+
+def verify(htmls, backend='lxml'):
+    """Compare $backend parser with BeautifulSoup parser field by field.
+
+    Args:
+        htmls (list): page sources
+        backend (str): parser to be verified
+    Return:
+        mismatches (list): list of (index, column, expected, actual)
+    """
+    mismatches = list()
+    for idx, html in enumerate(htmls):
+        expected = parse_article_bs4(html)
+        actual = parse_article(html, backend)
+        for column, value in expected.items():
+            same = value == actual[column] or (value != value and actual[column] != actual[column])
+            if not same:
+                mismatches.append((idx, column, value, actual[column]))
+    return mismatches
+
+
+def benchmark(htmls, backend='lxml', repeat=3):
+    """Measure parsing throughput.
+
+    Args:
+        htmls (list): page sources
+        backend (str): parser to be measured
+        repeat (int): number of passes over $htmls. best pass is reported
+    Return:
+        pages_per_sec (float): pages parsed per second
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in htmls:
+            parse_article(html, backend)
+        best = min(best, time.perf_counter() - start)
+    return len(htmls) / best
+
+
+if __name__ == '__main__':
+    # $ python parsing_article.py [cache_dir]
+    from html_cache import RawHTMLCache
+
+    cache = RawHTMLCache(sys.argv[1] if len(sys.argv) > 1 else './data/html')
+    # issue listing pages are keyed by absolute url, article pages by relative url
+    htmls = [cache.get(url) for url in cache.urls() if not url.startswith('http')]
+    print('{} pages in cache'.format(len(htmls)))
+
+    mismatches = verify(htmls)
+    print('{} mismatched fields'.format(len(mismatches)))
+    for mismatch in mismatches[:10]:
+        print(mismatch)
+
+    for backend in PARSERS:
+        print('{:5s} {:10.1f} pages/sec'.format(backend, benchmark(htmls, backend)))
@@ -0,0 +1,164 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Fetch/parse pipeline for crawling article. Fetch in thread, parse in process pool.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from parsing_article import parse_article
+
+
+def _parse_timed(html, backend):
+    start = time.perf_counter()
+    article = parse_article(html, backend)
+    return article, time.perf_counter() - start
+
+
+class StageCounter:
+    """Throughput counter of pipeline stage.
+
+    Args:
+        name (str): name of stage
+    Return:
+    """
+    def __init__(self, name):
+        self.name = name
+        self.n_items = 0
+        self.busy = 0.0
+        self.start = None
+        self.end = None
+        self.lock = threading.Lock()
+
+    def add(self, n_items, busy):
+        """Count processed items.
+
+        Args:
+            n_items (int): number of items processed
+            busy (float): seconds spent on items
+        Return:
+        """
+        with self.lock:
+            now = time.perf_counter()
+            if self.start is None:
+                self.start = now - busy
+            self.end = now
+            self.n_items += n_items
+            self.busy += busy
+
+    def summary(self):
+        """Summarize stage.
+
+        Args:
+        Return:
+            summary (dict): items, busy seconds, items per wall second, items per busy second
+        """
+        wall = (self.end - self.start) if self.start is not None else 0.0
+        return {
+            'stage': self.name,
+            'items': self.n_items,
+            'busy': self.busy,
+            'items/sec': self.n_items / wall if wall > 0 else 0.0,
+            'items/busy sec': self.n_items / self.busy if self.busy > 0 else 0.0
+        }
+
+
+class ArticlePipeline:
+    """Producer/consumer pipeline. Fetch thread pushes raw HTML to bounded queue and process pool parses it.
+        Fetch blocks when queue is full(backpressure), and records are yielded in input order.
+
+    Args:
+        fetch (callable): function of urls returning list of page sources
+        n_parsers (int): number of parsing processes
+        queue_size (int): maximum number of pages fetched but not yet parsed
+        batch_size (int): number of urls passed to $fetch at once
+        backend (str): parser backend of parsing_article
+    Return:
+    """
+    def __init__(self, fetch, n_parsers=4, queue_size=64, batch_size=32, backend='lxml'):
+        self.fetch = fetch
+        self.n_parsers = n_parsers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.backend = backend
+
+        self.fetch_counter = StageCounter('fetch')
+        self.parse_counter = StageCounter('parse')
+        self.max_queued = 0
+
+    def _produce(self, rows, pages, stop):
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                begin = time.perf_counter()
+                htmls = self.fetch([url for _, url in batch])
+                self.fetch_counter.add(len(batch), time.perf_counter() - begin)
+
+                for (title, url), html in zip(batch, htmls):
+                    while not stop.is_set():
+                        try:
+                            pages.put((title, url, html), timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+        except Exception as e:
+            pages.put(e)
+            return
+        pages.put(None)
+
+    def run(self, rows):
+        """Fetch and parse rows.
+
+        Args:
+            rows (list): list of (title, url)
+        Return:
+            results (generator): (title, url, html, article) in the order of $rows
+        """
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(rows, pages, stop), daemon=True)
+        producer.start()
+
+        pending = deque()
+        try:
+            with ProcessPoolExecutor(max_workers=self.n_parsers) as executor:
+                done = False
+                while not done or pending:
+                    # keep at most $queue_size pages in parser so memory stays bounded
+                    while not done and len(pending) < self.queue_size:
+                        try:
+                            item = pages.get(timeout=0.05 if pending else None)
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            done = True
+                        elif isinstance(item, Exception):
+                            raise item
+                        else:
+                            title, url, html = item
+                            pending.append((title, url, html, executor.submit(_parse_timed, html, self.backend)))
+                        self.max_queued = max(self.max_queued, pages.qsize())
+
+                    if pending and (pending[0][3].done() or done or len(pending) >= self.queue_size):
+                        title, url, html, future = pending.popleft()
+                        article, busy = future.result()
+                        self.parse_counter.add(1, busy)
+                        yield title, url, html, article
+        finally:
+            stop.set()
+
+    def summary(self):
+        """Summarize throughput of each stage.
+
+        Args:
+        Return:
+            summaries (list): summary dictionary per stage
+        """
+        return [self.fetch_counter.summary(), self.parse_counter.summary(), {'stage': 'queue', 'max queued': self.max_queued}]
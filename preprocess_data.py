@@ -17,6 +17,119 @@ import pandas as pd
 
 from tqdm import tqdm
 
+from storage import load_dataframe, save_dataframe
+
+
+# cleaning rules compiled once and shared by PreprocessingArticle and PreprocessingPipeline
+WHITESPACE_PATTERN = re.compile(r'[ \n\t][ \n\t]+')
+# lookahead keeps every position as candidate, so first vol and first no are same as separate extract
+VOLNO_PATTERN = re.compile(r'(?=Vol.([\d]+))|(?=No.([\d]+))')
+PAGE_PATTERN = re.compile(r'(?=([\d]+)-)|(?=-([\d]+))')
+
+
+def clean_author(value):
+    """Remove white spaces(\t\n ) of author and make list of authors. nan if not string."""
+    if not isinstance(value, str):
+        return np.nan
+    return WHITESPACE_PATTERN.sub('', value).replace(', ', ' ').split(',')
+
+
+def clean_keyword(value):
+    """Strip keyword and make list of keywords. nan if not string."""
+    if not isinstance(value, str):
+        return np.nan
+    return value.strip().split(' , ')
+
+
+def clean_abstract(value):
+    """Strip abstract and squeeze white spaces. nan if not string."""
+    if not isinstance(value, str):
+        return np.nan
+    return WHITESPACE_PATTERN.sub(' ', value.strip())
+
+
+def extract_pair(pattern, value):
+    """Extract first match of each group in one scan. nan if not matched.
+
+    Args:
+        pattern (re.Pattern): pattern of two alternative lookahead groups
+        value (str): string to scan
+    Return:
+        pair (tuple): (first, second)
+    """
+    first, second = np.nan, np.nan
+    if not isinstance(value, str):
+        return first, second
+    for match in pattern.finditer(value):
+        if first is np.nan and match.group(1) is not None:
+            first = match.group(1)
+        elif second is np.nan and match.group(2) is not None:
+            second = match.group(2)
+        if first is not np.nan and second is not np.nan:
+            break
+    return first, second
+
+
+class PreprocessingPipeline:
+    """Fused preprocessing of crawled article. Each column is scanned once with precompiled rules.
+        Output is same as calling preprocess_* methods of PreprocessingArticle in order.
+
+    Args:
+        steps (list): steps to apply among 'author', 'volno', 'keyword', 'page', 'abstract'
+        na_columns (list): columns to mark is_na_$column after steps, as find_empty_values
+    Return:
+    """
+    def __init__(self, steps=('author', 'volno', 'keyword', 'page', 'abstract'), na_columns=()):
+        self.steps = list(steps)
+        self.na_columns = list(na_columns)
+
+    def apply(self, dataframe):
+        """Apply steps to dataframe. Columns are replaced in place.
+
+        Args:
+            dataframe (pandas DataFrame): crawled article
+        Return:
+            dataframe (pandas DataFrame): same dataframe with preprocessed columns
+        """
+        for step in self.steps:
+            if step == 'author':
+                dataframe['author'] = [clean_author(value) for value in dataframe.author]
+            elif step == 'volno':
+                pairs = [extract_pair(VOLNO_PATTERN, value) for value in dataframe.volno]
+                dataframe['vol'] = [vol for vol, _ in pairs]
+                dataframe['no'] = [no for _, no in pairs]
+            elif step == 'keyword':
+                dataframe['keyword'] = [clean_keyword(value) for value in dataframe.keyword]
+            elif step == 'page':
+                pairs = [extract_pair(PAGE_PATTERN, value) for value in dataframe.page]
+                dataframe['page_start'] = [start for start, _ in pairs]
+                dataframe['page_end'] = [end for _, end in pairs]
+            elif step == 'abstract':
+                dataframe['abstract'] = [clean_abstract(value) for value in dataframe.abstract]
+            else:
+                raise ValueError('unknown step: {}'.format(step))
+
+        for column in self.na_columns:
+            dataframe['is_na_{}'.format(column)] = dataframe[column].isna()
+        return dataframe
+
+    def process_csv(self, load_fpath, save_fpath, chunksize=10000):
+        """Preprocess CSV chunk by chunk. Memory is bounded by $chunksize.
+
+        Args:
+            load_fpath (str): CSV path of crawled data
+            save_fpath (str): CSV path to save
+            chunksize (int): number of records per chunk
+        Return:
+            n_records (int): number of records processed
+        """
+        n_records = 0
+        for idx, chunk in enumerate(pd.read_csv(load_fpath, encoding='utf-8', chunksize=chunksize)):
+            chunk = self.apply(chunk)
+            chunk.to_csv(save_fpath, encoding='utf-8', index=False, mode='w' if idx == 0 else 'a', header=idx == 0)
+            n_records += len(chunk)
+        return n_records
+
 
 class PreprocessingArticle:
     """Preprocessing 한국음악치료학회지 Article crawled from RISS.
@@ -26,7 +139,7 @@ class PreprocessingArticle:
     Return:
     """
     def __init__(self, fpath):
-        self.dataframe = pd.read_csv(fpath, encoding='utf-8')
+        self.dataframe = load_dataframe(fpath, list_columns=[])
 
     def sample_item(self, column, n):
         """Sampling record in dataframe
@@ -48,9 +161,7 @@ class PreprocessingArticle:
         Args:
         Return:
         """
-        self.dataframe['author'] = self.dataframe.author.str.replace(r'[ \n\t][ \n\t]+', '')
-        self.dataframe['author'] = self.dataframe.author.str.replace(', ', ' ')
-        self.dataframe['author'] = self.dataframe.author.str.split(',')
+        self.dataframe = PreprocessingPipeline(['author']).apply(self.dataframe)
 
     def preprocess_volno(self):
         """Split volumne and no.
@@ -58,8 +169,7 @@ class PreprocessingArticle:
         Args:
         Return:
         """
-        self.dataframe['vol'] = self.dataframe.volno.str.extract(r'(?:Vol.)([\d]+)')
-        self.dataframe['no'] = self.dataframe.volno.str.extract(r'(?:No.)([\d]+)')
+        self.dataframe = PreprocessingPipeline(['volno']).apply(self.dataframe)
 
     def preprocess_keyword(self):
         """Split keyword to make list.
@@ -67,9 +177,7 @@ class PreprocessingArticle:
         Args:
         Return:
         """
-        self.dataframe['keyword'] = self.dataframe.keyword.str.strip()
-        self.dataframe['author'] = self.dataframe.author.str.replace(r'[ \n\t][ \n\t]+', ' ')
-        self.dataframe['keyword'] = self.dataframe.keyword.str.split(' , ')
+        self.dataframe = PreprocessingPipeline(['keyword']).apply(self.dataframe)
     
     def preprocess_page(self):
         """Split page into start page and end page.
@@ -77,8 +185,7 @@ class PreprocessingArticle:
         Args:
         Return:
         """
-        self.dataframe['page_start'] = self.dataframe.page.str.extract(r'([\d]+)(?:-)')
-        self.dataframe['page_end'] = self.dataframe.page.str.extract(r'(?:-)([\d]+)')
+        self.dataframe = PreprocessingPipeline(['page']).apply(self.dataframe)
 
     def preprocess_abstract(self):
         """Remove White Space in abstract
@@ -86,8 +193,7 @@ class PreprocessingArticle:
         Args:
         Return:
         """
-        self.dataframe['abstract'] = self.dataframe.abstract.str.strip()
-        self.dataframe['abstract'] = self.dataframe.abstract.str.replace(r'[ \n\t][ \n\t]+', ' ')
+        self.dataframe = PreprocessingPipeline(['abstract']).apply(self.dataframe)
 
     def find_empty_values(self, columns):
         """Wheter column in $columns is na or not. Make new column.
@@ -110,10 +216,10 @@ class PreprocessingArticle:
         """Save Dataframe Processed.
 
         Args:
-            fpath (str): path to save dataframe as CSV
+            fpath (str): path to save dataframe. Parquet if ends with .parquet else CSV
         Return:
         """
-        self.dataframe.to_csv(fpath, encoding='utf-8', index=False)
+        save_dataframe(self.dataframe, fpath)
 
 if __name__ == '__main__':
     fpath = './data/article_raw.csv'
@@ -142,8 +248,11 @@ if __name__ == '__main__':
     print(preprocessor.sample_item('is_na_keyword', 10))
     print(preprocessor.sample_item('is_na_abstract', 10))
 
+    # CSV to fill empty values manually(article_filled.csv), Parquet for loading fast
     fpath = './data/article.csv'
     preprocessor.save(fpath)
+    fpath = './data/article.parquet'
+    preprocessor.save(fpath)
 
 
 
@@ -0,0 +1,74 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-22 (Last Modified)
+Objective: Adaptive request throttling for crawling RISS.
+"""
+
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Throttle requests to server. Back off on slow response or error, speed up when server is healthy.
+        Safe to share among crawling threads.
+
+    Args:
+        min_delay (float): minimum seconds between requests
+        max_delay (float): maximum seconds between requests
+        slow_latency (float): response slower than this (seconds) is regarded as unhealthy
+        backoff (float): multiplier applied to delay when unhealthy
+        speedup (float): multiplier applied to delay when healthy
+    Return:
+    """
+    def __init__(self, min_delay=0.2, max_delay=10.0, slow_latency=3.0, backoff=2.0, speedup=0.8):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.slow_latency = slow_latency
+        self.backoff = backoff
+        self.speedup = speedup
+
+        self.delay = min_delay
+        self.last_request = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Reserve next request slot without blocking. Used by asyncio fetcher.
+
+        Args:
+        Return:
+            waited (float): seconds to wait before request
+        """
+        with self.lock:
+            now = time.monotonic()
+            waited = max(0.0, self.last_request + self.delay - now)
+            self.last_request = now + waited
+        return waited
+
+    def wait(self):
+        """Block until current delay has passed since last request.
+
+        Args:
+        Return:
+            waited (float): seconds slept
+        """
+        waited = self.reserve()
+        if waited > 0:
+            time.sleep(waited)
+        return waited
+
+    def update(self, latency, error=False):
+        """Adjust delay with latency of last response.
+
+        Args:
+            latency (float): seconds taken by last response
+            error (boolean): whether last request failed
+        Return:
+            delay (float): adjusted delay
+        """
+        with self.lock:
+            if error or latency > self.slow_latency:
+                self.delay = min(self.max_delay, max(self.delay, self.min_delay) * self.backoff)
+            else:
+                self.delay = max(self.min_delay, self.delay * self.speedup)
+            return self.delay
@@ -0,0 +1,65 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Lazy set-up of plotting stack and report of start-up time.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+def plotting(font_fpath, font_size):
+    """Import matplotlib and seaborn on first use and set korean font and style.
+
+    Args:
+        font_fpath (str): path of font file
+        font_size (int): font size
+    Return:
+        plt (module): matplotlib.pyplot
+        sns (module): seaborn
+    """
+    import matplotlib.font_manager as fm
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-darkgrid')
+    plt.rcParams['font.family'] = fm.FontProperties(fname=font_fpath).get_name()
+    plt.rcParams['font.size'] = font_size
+    return plt, sns
+
+
+class StartupReport:
+    """Elapsed time of each lazily initialized component.
+
+    Args:
+        name (str): name of owner, ex) ArticleNLP
+    Return:
+    """
+    def __init__(self, name):
+        self.name = name
+        self.timings = dict()
+
+    @contextmanager
+    def measure(self, component):
+        """Measure elapsed time of block as $component.
+
+        Args:
+            component (str): name of component, ex) dataframe, tokenizer
+        Return:
+        """
+        start = time.perf_counter()
+        yield
+        self.timings[component] = self.timings.get(component, 0) + time.perf_counter() - start
+
+    def report(self):
+        """Print elapsed time per component.
+
+        Args:
+        Return:
+            timings (dict): component - seconds
+        """
+        print('[{}] start-up {:.3f}s'.format(self.name, sum(self.timings.values())))
+        for component, seconds in self.timings.items():
+            print('    {:<12s} {:8.3f}s'.format(component, seconds))
+        return dict(self.timings)
@@ -0,0 +1,106 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Load and save article dataframe. Parquet with native list columns, CSV for manual editing.
+"""
+
+import os
+from ast import literal_eval
+
+import numpy as np
+import pandas as pd
+
+
+LIST_COLUMNS = ['author', 'keyword']
+INTEGER_COLUMNS = ['year', 'vol', 'no', 'page_start', 'page_end']
+# language is left object, since loaders fill its missing value with new label
+CATEGORY_COLUMNS = ['organization', 'name', 'kdc', 'kci', 'media', 'link', 'location']
+
+
+def _is_parquet(fpath):
+    return os.path.splitext(fpath)[1] in ('.parquet', '.pq')
+
+
+def _to_list(value):
+    if isinstance(value, list):
+        return value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, str) and value.startswith('['):
+        return literal_eval(value)
+    return np.nan
+
+
+def parse_list_column(values):
+    """Parse list column loaded as string, ex) "['a', 'b']" -> ['a', 'b'].
+
+    Args:
+        values (iterable): values of list column
+    Return:
+        values (list): python list per value, nan if empty
+    """
+    return [_to_list(value) for value in values]
+
+
+def compact_dtypes(dataframe):
+    """Convert columns to compact dtypes. Integer column to nullable Int32, repeated string to category.
+
+    Args:
+        dataframe (pandas DataFrame): article dataframe
+    Return:
+        dataframe (pandas DataFrame): same dataframe with compact columns
+    """
+    for column in INTEGER_COLUMNS:
+        if column in dataframe.columns:
+            values = pd.to_numeric(dataframe[column], errors='coerce')
+            if values.isna().sum() == dataframe[column].isna().sum():
+                dataframe[column] = values.astype('Int32')
+    for column in CATEGORY_COLUMNS:
+        if column in dataframe.columns:
+            dataframe[column] = dataframe[column].astype('category')
+    return dataframe
+
+
+def save_dataframe(dataframe, fpath):
+    """Save article dataframe. Parquet if $fpath ends with .parquet, else CSV.
+        In Parquet, list column is saved as list<string> and other columns in compact dtypes.
+
+    Args:
+        dataframe (pandas DataFrame): article dataframe
+        fpath (str): path to save
+    Return:
+    """
+    if not _is_parquet(fpath):
+        dataframe.to_csv(fpath, encoding='utf-8', index=False)
+        return
+
+    dataframe = dataframe.copy()
+    for column in LIST_COLUMNS:
+        if column in dataframe.columns:
+            dataframe[column] = [
+                [str(v) for v in value] if isinstance(value, list) else None for value in dataframe[column].apply(_to_list)
+            ]
+    dataframe = compact_dtypes(dataframe)
+    dataframe.to_parquet(fpath, index=False)
+
+
+def load_dataframe(fpath, columns=None, list_columns=LIST_COLUMNS):
+    """Load article dataframe saved by save_dataframe. List column is loaded as python list, nan if empty.
+
+    Args:
+        fpath (str): path to load. Parquet or CSV
+        columns (list): columns to be loaded. only these columns are read from Parquet. Default all.
+        list_columns (list): columns holding list. empty for raw crawled data
+    Return:
+        dataframe (pandas DataFrame): article dataframe
+    """
+    if _is_parquet(fpath):
+        dataframe = pd.read_parquet(fpath, columns=columns)
+    else:
+        dataframe = pd.read_csv(fpath, encoding='utf-8', usecols=columns)
+
+    for column in list_columns:
+        if column in dataframe.columns:
+            dataframe[column] = parse_list_column(dataframe[column])
+    return dataframe
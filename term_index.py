@@ -0,0 +1,243 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Inverted index of keywords and abstract nouns with year facet.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from corpus import TokenCorpus
+
+
+def fingerprint(*columns):
+    """Hash of dataset columns. Used to check persisted index is built from same dataset.
+
+    Args:
+        columns (list): iterables of values, ex) year, keyword, abstract
+    Return:
+        digest (str): hex digest
+    """
+    digest = hashlib.sha1()
+    for column in columns:
+        for value in column:
+            digest.update(repr(value).encode('utf-8'))
+            digest.update(b'\x1f')
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+class TermIndex:
+    """Inverted index (term -> posting list of document ids with term frequency) per field with year of each document.
+        Postings and forward index are CSR arrays, so queries are array slices and bincounts.
+
+    Args:
+        fields (dict): field name - list of tokens per document or TokenCorpus, ex) {'keyword': [...], 'noun': corpus}
+        years (list): year of each document. missing year is stored as MISSING_YEAR and left out of year facet
+        version (str): fingerprint of dataset
+    Return:
+    """
+    MISSING_YEAR = -1
+
+    def __init__(self, fields, years, version=''):
+        years = pd.to_numeric(pd.Series(list(years), dtype=object), errors='coerce')
+        self.years = years.fillna(self.MISSING_YEAR).to_numpy(dtype=np.int32)
+        self.version = version
+        self.fields = dict()
+        for field, docs in fields.items():
+            self.fields[field] = self._build(docs)
+
+    @staticmethod
+    def _build(docs):
+        corpus = docs if isinstance(docs, TokenCorpus) else TokenCorpus.from_docs(docs)
+        vocabulary = dict(corpus.vocabulary)
+        n_docs = len(corpus)
+        n_terms = len(vocabulary)
+        term_ids = np.asarray(corpus.ids, dtype=np.int32)
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int32), np.diff(corpus.indptr))
+
+        # (term, doc) pairs with frequency, sorted by term then doc
+        keys = term_ids.astype(np.int64) * max(n_docs, 1) + doc_ids
+        keys, tf = np.unique(keys, return_counts=True)
+        posting_terms = (keys // max(n_docs, 1)).astype(np.int32)
+        posting_docs = (keys % max(n_docs, 1)).astype(np.int32)
+
+        order = np.lexsort((posting_terms, posting_docs))
+        return {
+            'terms': np.array(corpus.terms, dtype=str),
+            'vocabulary': vocabulary,
+            'indptr': np.searchsorted(posting_terms, np.arange(n_terms + 1)).astype(np.int64),
+            'docs': posting_docs,
+            'tf': tf.astype(np.int32),
+            'forward_indptr': np.searchsorted(posting_docs[order], np.arange(n_docs + 1)).astype(np.int64),
+            'forward_terms': posting_terms[order],
+            'forward_tf': tf[order].astype(np.int32),
+            'frequency': np.bincount(posting_terms, weights=tf, minlength=n_terms).astype(np.int64)
+        }
+
+    def postings(self, term, field):
+        """Posting list of term.
+
+        Args:
+            term (str): term to be queried
+            field (str): field of term, ex) 'keyword', 'noun'
+        Return:
+            docs (numpy array): document ids having term
+            tf (numpy array): frequency of term in each document
+        """
+        index = self.fields[field]
+        term_id = index['vocabulary'].get(term)
+        if term_id is None:
+            return np.array([], dtype=np.int32), np.array([], dtype=np.int32)
+        start, end = index['indptr'][term_id], index['indptr'][term_id + 1]
+        return index['docs'][start:end], index['tf'][start:end]
+
+    def frequency(self, term, field):
+        """Total frequency of term.
+
+        Args:
+            term (str): term to be queried
+            field (str): field of term
+        Return:
+            frequency (int): number of occurrences
+        """
+        term_id = self.fields[field]['vocabulary'].get(term)
+        return 0 if term_id is None else int(self.fields[field]['frequency'][term_id])
+
+    def document_frequency(self, term, field):
+        """Number of documents having term.
+
+        Args:
+            term (str): term to be queried
+            field (str): field of term
+        Return:
+            document_frequency (int): number of documents
+        """
+        return len(self.postings(term, field)[0])
+
+    def most_common(self, field, n=-1):
+        """Most frequent terms. Tie is ordered by first occurrence, same as collections.Counter.
+
+        Args:
+            field (str): field of terms
+            n (int): number of terms. all terms if -1
+        Return:
+            terms (list): list of (term, frequency)
+        """
+        index = self.fields[field]
+        order = np.argsort(-index['frequency'], kind='stable')
+        if n != -1:
+            order = order[:n]
+        return [(str(index['terms'][i]), int(index['frequency'][i])) for i in order]
+
+    def _year_range(self):
+        years = self.years[self.years != self.MISSING_YEAR]
+        return range(years.min(), years.max() + 1) if len(years) else range(0)
+
+    def trend(self, term, field, years=None):
+        """Frequency of term per year.
+
+        Args:
+            term (str): term to be queried
+            field (str): field of term
+            years (list): years of result. Default from first to last known year of documents
+        Return:
+            trend (pandas Series): year - frequency
+        """
+        if years is None:
+            years = self._year_range()
+        years = np.asarray(list(years))
+        docs, tf = self.postings(term, field)
+        counts = pd.Series(tf, index=self.years[docs]).groupby(level=0).sum()
+        return counts.reindex(years, fill_value=0).astype(np.int64)
+
+    def year_table(self, terms, field, years=None):
+        """Frequency of terms per year.
+
+        Args:
+            terms (list): terms of rows
+            field (str): field of terms
+            years (list): years of columns. Default from first to last known year of documents
+        Return:
+            df (pandas DataFrame): term by year frequency
+        """
+        if years is None:
+            years = self._year_range()
+        years = list(years)
+        offset = years[0] if years else 0
+
+        table = np.zeros((len(terms), len(years)), dtype=np.int64)
+        for row, term in enumerate(terms):
+            docs, tf = self.postings(term, field)
+            year_ids = self.years[docs] - offset
+            mask = (year_ids >= 0) & (year_ids < len(years))
+            table[row] = np.bincount(year_ids[mask], weights=tf[mask], minlength=len(years))
+        return pd.DataFrame(table, index=list(terms), columns=years)
+
+    def cooccurring(self, term, field, other_field=None, n=10):
+        """Terms occurring in the same documents with term.
+
+        Args:
+            term (str): term to be queried
+            field (str): field of term
+            other_field (str): field of cooccurring terms. Default $field
+            n (int): number of terms. all terms if -1
+        Return:
+            terms (list): list of (term, number of documents having both) in descending order
+        """
+        other_field = field if other_field is None else other_field
+        other = self.fields[other_field]
+        docs, _ = self.postings(term, field)
+
+        starts, ends = other['forward_indptr'][docs], other['forward_indptr'][docs + 1]
+        if len(docs):
+            term_ids = np.concatenate([other['forward_terms'][s:e] for s, e in zip(starts, ends)])
+        else:
+            term_ids = np.array([], dtype=np.int32)
+        counts = np.bincount(term_ids, minlength=len(other['terms']))
+
+        self_id = other['vocabulary'].get(term) if other_field == field else None
+        if self_id is not None:
+            counts[self_id] = 0
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] > 0]
+        if n != -1:
+            order = order[:n]
+        return [(str(other['terms'][i]), int(counts[i])) for i in order]
+
+    def save(self, fpath):
+        """Save index in compressed npz.
+
+        Args:
+            fpath (str): path to save
+        Return:
+        """
+        arrays = {'years': self.years, 'version': np.array(self.version), 'fields': np.array(list(self.fields), dtype=str)}
+        for field, index in self.fields.items():
+            for name, array in index.items():
+                if name != 'vocabulary':
+                    arrays['{}/{}'.format(field, name)] = array
+        np.savez_compressed(fpath, **arrays)
+
+    @classmethod
+    def load(cls, fpath):
+        """Load index saved by save.
+
+        Args:
+            fpath (str): path to load
+        Return:
+            index (TermIndex): loaded index
+        """
+        with np.load(fpath, allow_pickle=False) as arrays:
+            index = cls({}, arrays['years'], str(arrays['version']))
+            for field in arrays['fields']:
+                fields = {
+                    name: arrays['{}/{}'.format(field, name)]
+                    for name in ['terms', 'indptr', 'docs', 'tf', 'forward_indptr', 'forward_terms', 'forward_tf', 'frequency']
+                }
+                fields['vocabulary'] = {term: idx for idx, term in enumerate(fields['terms'].tolist())}
+                index.fields[str(field)] = fields
+        return index
@@ -0,0 +1,162 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Incremental and mergeable term frequency of keywords and abstract nouns.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+
+import pandas as pd
+
+
+def document_key(*values):
+    """Key of document from its values. Same document has same key across runs and shards.
+
+    Args:
+        values (list): values of document, ex) year, keyword, abstract
+    Return:
+        key (str): hex digest
+    """
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(repr(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def document_keys(*columns):
+    """Key of each row of dataset. Identical rows, ex) repeated listing of an article, are told apart
+        by their order of occurrence, so every row is counted as in Counter over whole dataset.
+
+    Args:
+        columns (list): iterables of values, ex) year, keyword, abstract
+    Return:
+        keys (list): hex digest per row
+    """
+    occurrences = Counter()
+    keys = list()
+    for values in zip(*columns):
+        content = document_key(*values)
+        keys.append(document_key(content, occurrences[content]))
+        occurrences[content] += 1
+    return keys
+
+
+class TermStatistics:
+    """Term frequency overall and per year. Documents already counted are skipped,
+        so update costs only new documents, and statistics of disjoint shards can be merged.
+        Order of terms follows first occurrence, so most_common is same as Counter of whole corpus.
+
+    Args:
+        version (str): version of tokenizer the terms come from, ex) TokenCache.version. empty for keywords
+    Return:
+    """
+    def __init__(self, version=''):
+        self.version = version
+        self.keys = set()
+        self.overall = Counter()
+        self.by_year = dict()
+
+    def update(self, keys, years, docs):
+        """Count terms of documents not counted yet.
+
+        Args:
+            keys (list): key of each document. see document_keys
+            years (list): year of each document. document of missing year is counted only overall
+            docs (list): list of terms per document
+        Return:
+            n_added (int): number of newly counted documents
+        """
+        n_added = 0
+        for key, year, terms in zip(keys, years, docs):
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            self.overall.update(terms)
+            if not pd.isna(year):
+                self.by_year.setdefault(int(year), Counter()).update(terms)
+            n_added += 1
+        return n_added
+
+    def merge(self, other):
+        """Add statistics of another shard.
+
+        Args:
+            other (TermStatistics): statistics of documents disjoint with this
+        Return:
+            self (TermStatistics): merged statistics
+        """
+        if self.version != other.version:
+            raise ValueError('statistics of different tokenizer versions cannot be merged')
+        overlap = self.keys & other.keys
+        if overlap:
+            raise ValueError('{} documents are counted in both statistics'.format(len(overlap)))
+        self.keys |= other.keys
+        self.overall.update(other.overall)
+        for year, counter in other.by_year.items():
+            self.by_year.setdefault(year, Counter()).update(counter)
+        return self
+
+    def counter(self, min_length=1):
+        """Frequency of terms overall.
+
+        Args:
+            min_length (int): minimum length of term
+        Return:
+            counter (Counter): counter for terms
+        """
+        if min_length <= 1:
+            return Counter(self.overall)
+        return Counter({term: freq for term, freq in self.overall.items() if len(term) >= min_length})
+
+    def save(self, fpath):
+        """Save statistics in json.
+
+        Args:
+            fpath (str): path to save
+        Return:
+        """
+        data = {
+            'version': self.version,
+            'keys': sorted(self.keys),
+            'overall': self.overall,
+            'by_year': {str(year): counter for year, counter in sorted(self.by_year.items())}
+        }
+        with open(fpath + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(fpath + '.tmp', fpath)
+
+    @classmethod
+    def load(cls, fpath):
+        """Load statistics saved by save. Empty statistics if file does not exist.
+
+        Args:
+            fpath (str): path to load
+        Return:
+            stats (TermStatistics): loaded statistics
+        """
+        stats = cls()
+        if not os.path.exists(fpath):
+            return stats
+        with open(fpath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        stats.version = data.get('version', '')
+        stats.keys = set(data['keys'])
+        stats.overall = Counter(data['overall'])
+        stats.by_year = {int(year): Counter(counter) for year, counter in data['by_year'].items()}
+        return stats
+
+
+if __name__ == '__main__':
+    # $ python term_stats.py merged.json shard1.json shard2.json ...
+    shards = [TermStatistics.load(fpath) for fpath in sys.argv[2:]]
+    merged = TermStatistics(shards[0].version if shards else '')
+    for shard in shards:
+        merged.merge(shard)
+    merged.save(sys.argv[1])
+    print('{} documents, {} terms'.format(len(merged.keys), len(merged.overall)))
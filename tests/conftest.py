@@ -0,0 +1,249 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Local fixture server of saved RISS pages and driver stand-in for crawler tests.
+"""
+
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURE_DPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'riss')
+
+
+class FixtureServer:
+    """HTTP/1.1 keep-alive server of saved RISS pages in a background thread.
+        Requests, connections and concurrent requests are recorded, and request can be failed on purpose.
+
+    Args:
+        dpath (str): directory of saved pages
+        delay (float): seconds to wait before each response
+    Return:
+    """
+    def __init__(self, dpath=FIXTURE_DPATH, delay=0.0):
+        self.dpath = dpath
+        self.delay = delay
+        self.failures = dict()
+        self.requests = list()
+        self.n_connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.n_connections += 1
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append(self.path)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    n_times, status = server.failures.get(self.path, (0, None))
+                    fail = n_times > 0
+                    if fail:
+                        server.failures[self.path] = (n_times - 1, status)
+                try:
+                    time.sleep(server.delay)
+                    if fail and status is None:
+                        self.close_connection = True
+                        return
+                    if fail:
+                        self.send_error(status)
+                        return
+
+                    fpath = os.path.join(server.dpath, os.path.basename(self.path.split('?')[0]))
+                    if not os.path.exists(fpath):
+                        self.send_error(404)
+                        return
+                    with open(fpath, 'rb') as f:
+                        body = f.read()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.host = 'http://127.0.0.1:{}'.format(self.httpd.server_address[1])
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def fail(self, path, n_times=1, status=None):
+        """Fail next $n_times requests of path. Connection is dropped without response if $status is None.
+
+        Args:
+            path (str): path of page, ex) /article1.html
+            n_times (int): number of requests to fail
+            status (int): HTTP status of failed response, ex) 503
+        Return:
+        """
+        with self.lock:
+            self.failures[path] = (n_times, status)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FixtureElement:
+    """Element found by FixtureDriver. Stale once driver opens another page."""
+    def __init__(self, driver, tag):
+        self.driver = driver
+        self.tag = tag
+        self.generation = driver.generation
+
+    def _check(self):
+        if self.generation != self.driver.generation:
+            raise StaleElementReferenceException('element is not attached to the page document')
+
+    def is_enabled(self):
+        self._check()
+        return True
+
+    def is_displayed(self):
+        self._check()
+        return id(self.tag) not in self.driver.hidden
+
+    @property
+    def text(self):
+        self._check()
+        return self.tag.get_text()
+
+    def get_attribute(self, name):
+        self._check()
+        if name == 'textContent':
+            return self.tag.get_text()
+        return self.tag.get(name)
+
+
+class FixtureDriver:
+    """Stand-in of webdriver.Chrome over plain HTTP for methods used by CrawlingArticle.
+        Clicking moreView hides it and, if it links to another url, loads that page into the document as RISS script does.
+
+    Args:
+        stats (dict): shared counter of live and maximum live drivers
+        click_delay (float): seconds until click takes effect, as script of real page runs after click returns
+    Return:
+    """
+    def __init__(self, stats, click_delay=0.0):
+        self.stats = stats
+        self.click_delay = click_delay
+        self.lock = threading.RLock()
+        self.soup = BeautifulSoup('', 'html.parser')
+        self.url = None
+        self.generation = 0
+        self.hidden = set()
+        with stats['lock']:
+            stats['live'] += 1
+            stats['max_live'] = max(stats['max_live'], stats['live'])
+
+    def get(self, url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            html = response.read().decode('utf-8')
+        with self.lock:
+            self.url = url
+            self.soup = BeautifulSoup(html, 'html.parser')
+            self.generation += 1
+            self.hidden = set()
+
+    @property
+    def page_source(self):
+        with self.lock:
+            return str(self.soup)
+
+    def find_elements(self, by, value):
+        with self.lock:
+            if by == By.CSS_SELECTOR:
+                tags = self.soup.select(value)
+            elif by == By.CLASS_NAME:
+                tags = self.soup.find_all(class_=value)
+            else:
+                raise NotImplementedError(by)
+            return [FixtureElement(self, tag) for tag in tags]
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+    def find_elements_by_class_name(self, name):
+        return self.find_elements(By.CLASS_NAME, name)
+
+    def find_elements_by_css_selector(self, selector):
+        return self.find_elements(By.CSS_SELECTOR, selector)
+
+    def execute_script(self, script, element):
+        element._check()
+        if self.click_delay > 0:
+            timer = threading.Timer(self.click_delay, self._click, (element,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._click(element)
+
+    def _click(self, element):
+        href = element.tag.get('href', '')
+        fragment = None
+        if not href.startswith('javascript'):
+            host = self.url[:self.url.index('/', len('http://'))]
+            with urllib.request.urlopen(host + href, timeout=5) as response:
+                fragment = BeautifulSoup(response.read().decode('utf-8'), 'html.parser')
+        with self.lock:
+            if element.generation != self.generation:
+                return
+            if fragment is not None:
+                for child in list(fragment.body.children):
+                    self.soup.body.append(child)
+            self.hidden.add(id(element.tag))
+
+    def close(self):
+        with self.stats['lock']:
+            self.stats['live'] -= 1
+
+
+@pytest.fixture
+def fixture_server():
+    server = FixtureServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fixture_driver(monkeypatch):
+    """Replace webdriver.Chrome of crawling_data with FixtureDriver. Yields shared driver counter."""
+    import crawling_data
+
+    stats = {'lock': threading.Lock(), 'live': 0, 'max_live': 0, 'click_delay': 0.0}
+    monkeypatch.setattr(
+        crawling_data.webdriver, 'Chrome', lambda *args, **kwargs: FixtureDriver(stats, stats['click_delay'])
+    )
+    return stats
@@ -0,0 +1,114 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Test parallel crawl of article detail pages against local fixture server.
+"""
+
+import json
+
+import pandas as pd
+
+from crawling_data import CrawlingArticle
+from rate_limiter import AdaptiveRateLimiter
+
+ARTICLES = ['article{}.html'.format(idx) for idx in range(1, 7)]
+
+
+def write_title_url(tmp_path):
+    fpath = tmp_path / 'title-url.csv'
+    df = pd.DataFrame({'title': ['title {}'.format(idx) for idx in range(len(ARTICLES))], 'url': ['/' + name for name in ARTICLES]})
+    df.to_csv(fpath, encoding='utf-8', index=False)
+    return fpath, df
+
+
+def test_crawl_article_parallel(tmp_path, fixture_server, fixture_driver):
+    fixture_server.delay = 0.1
+    fixture_server.fail('/article3.html', n_times=1)
+    load_fpath, title_url_df = write_title_url(tmp_path)
+    save_fpath = tmp_path / 'article_raw.csv'
+
+    crawler = CrawlingArticle('chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=AdaptiveRateLimiter(min_delay=0.0))
+    crawler.crawl_article_parallel(str(load_fpath), str(save_fpath), n_workers=2, n_retry=3)
+    crawler.close()
+
+    # retried after dropped connection
+    assert fixture_server.requests.count('/article3.html') == 2
+    # workers run concurrently, capped by number of workers
+    assert 1 < fixture_server.max_in_flight <= 2
+    # driver of crawler itself and one per worker
+    assert fixture_driver['max_live'] <= 1 + 2
+    assert fixture_driver['live'] == 0
+
+    # rows in the order of title-url regardless of which worker finished first
+    article_df = pd.read_csv(save_fpath, encoding='utf-8')
+    assert list(article_df.title) == list(title_url_df.title)
+    assert list(article_df.year) == [2013, 2013, 2014, 2014, 2015, 2015]
+    assert article_df.abstract.notna().all()
+    assert article_df.abstract.iloc[5].startswith('본 연구는 2000년부터')
+
+
+def test_crawl_article_parallel_resume(tmp_path, fixture_server, fixture_driver):
+    fixture_server.fail('/article2.html', n_times=2)
+    load_fpath, title_url_df = write_title_url(tmp_path)
+    save_fpath = tmp_path / 'article_raw.csv'
+
+    crawler = CrawlingArticle('chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=AdaptiveRateLimiter(min_delay=0.0))
+    crawler.crawl_article_parallel(str(load_fpath), str(save_fpath), n_workers=3, n_retry=2)
+
+    # failed article is not checkpointed
+    with open(tmp_path / 'article_raw.jsonl', encoding='utf-8') as f:
+        urls = [json.loads(line)['url'] for line in f]
+    assert '/article2.html' not in urls
+    assert len(pd.read_csv(save_fpath, encoding='utf-8')) == len(ARTICLES) - 1
+
+    # restarted crawl fetches only the failed article and keeps order
+    n_requests = len(fixture_server.requests)
+    crawler.crawl_article_parallel(str(load_fpath), str(save_fpath), n_workers=3, n_retry=2)
+    crawler.close()
+    assert fixture_server.requests[n_requests:] == ['/article2.html']
+
+    article_df = pd.read_csv(save_fpath, encoding='utf-8')
+    assert list(article_df.title) == list(title_url_df.title)
+
+
+def test_fetch_article_waits_for_more_view(fixture_server, fixture_driver):
+    # abstract of article6 is loaded by moreView after click returns, while other text section already exists
+    fixture_driver['click_delay'] = 0.3
+    crawler = CrawlingArticle('chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=AdaptiveRateLimiter(min_delay=0.0))
+    article = crawler.parse_article(crawler.fetch_article('/article6.html'))
+    crawler.close()
+
+    assert article['abstract'].startswith('본 연구는 2000년부터')
+    assert crawler.latencies[-1]['wait'] >= 0.3
+    assert not crawler.latencies[-1]['timeout']
+
+
+def test_reparse_rewrites_checkpoint(tmp_path, fixture_server, fixture_driver, monkeypatch):
+    import crawling_data
+    from html_cache import RawHTMLCache
+
+    load_fpath, title_url_df = write_title_url(tmp_path)
+    save_fpath = tmp_path / 'article_raw.csv'
+    cache = RawHTMLCache(str(tmp_path / 'html'))
+    crawler = CrawlingArticle(
+        'chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=AdaptiveRateLimiter(min_delay=0.0), cache=cache
+    )
+    crawler.crawl_article(str(load_fpath), str(save_fpath))
+
+    # parser fixed after crawl
+    parse_article = crawling_data.parse_article
+    monkeypatch.setattr(crawling_data, 'parse_article', lambda html, backend: dict(parse_article(html, backend), media='FIXED'))
+    n_requests = len(fixture_server.requests)
+    assert CrawlingArticle.reparse(str(load_fpath), str(save_fpath), cache) == 0
+    assert len(fixture_server.requests) == n_requests
+    assert (pd.read_csv(save_fpath, encoding='utf-8').media == 'FIXED').all()
+
+    # next crawl exports checkpoint, which keeps reparsed records
+    crawler.crawl_article(str(load_fpath), str(save_fpath), urls=[])
+    crawler.close()
+    article_df = pd.read_csv(save_fpath, encoding='utf-8')
+    assert (article_df.media == 'FIXED').all()
+    assert list(article_df.title) == list(title_url_df.title)
+    with open(tmp_path / 'article_raw.jsonl', encoding='utf-8') as f:
+        assert sum(1 for _ in f) == len(ARTICLES)
@@ -0,0 +1,67 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Test asyncio HTTP fetcher against local fixture server and parity with driver path.
+"""
+
+from crawling_data import CrawlingArticle
+from fetching_article import AsyncHTTPFetcher
+from parsing_article import parse_article
+from rate_limiter import AdaptiveRateLimiter
+
+URLS = ['/article{}.html'.format(idx) for idx in range(1, 7)]
+
+
+def same_article(expected, actual):
+    return all(value == actual[column] or (value != value and actual[column] != actual[column]) for column, value in expected.items())
+
+
+def test_keep_alive(fixture_server):
+    fetcher = AsyncHTTPFetcher(fixture_server.host, n_connections=2, rate_limiter=AdaptiveRateLimiter(min_delay=0.0))
+    htmls = fetcher.fetch_many(URLS)
+    htmls += fetcher.fetch_many(URLS)
+    fetcher.close()
+
+    # 6 pages and moreView of article6, twice
+    assert len(fixture_server.requests) == 14
+    assert all(html is not None for html in htmls)
+    # connections of pool are reused across requests and calls
+    assert fixture_server.n_connections <= 2
+
+
+def test_failure_falls_back_to_driver(fixture_server, fixture_driver):
+    fixture_server.fail('/article2.html', n_times=1, status=503)
+    rate_limiter = AdaptiveRateLimiter(min_delay=0.0)
+    fetcher = AsyncHTTPFetcher(fixture_server.host, n_connections=4, rate_limiter=rate_limiter)
+    crawler = CrawlingArticle('chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=rate_limiter)
+
+    assert fetcher.fetch_many(['/article2.html', '/article1.html'])[0] is None
+    timeouts = {latency['url']: latency['timeout'] for latency in fetcher.latencies}
+    assert timeouts == {fixture_server.host + '/article2.html': True, fixture_server.host + '/article1.html': False}
+
+    # failed page is fetched again by driver
+    fixture_server.fail('/article2.html', n_times=1, status=503)
+    htmls = crawler.fetch_pages(fetcher, ['/article2.html'])
+    fetcher.close()
+    crawler.close()
+
+    assert fixture_server.requests.count('/article2.html') == 3
+    assert parse_article(htmls[0])['volno'] == 'Vol.10 No.2 [2013]'
+
+
+def test_parser_parity_with_driver(fixture_server, fixture_driver):
+    rate_limiter = AdaptiveRateLimiter(min_delay=0.0)
+    fetcher = AsyncHTTPFetcher(fixture_server.host, n_connections=4, rate_limiter=rate_limiter)
+    crawler = CrawlingArticle('chromedriver', fixture_server.host + '/', timeout=2, rate_limiter=rate_limiter)
+
+    async_articles = [parse_article(html) for html in fetcher.fetch_many(URLS)]
+    driver_articles = [parse_article(html) for html in crawler.fetch_many(URLS)]
+    fetcher.close()
+    crawler.close()
+
+    for expected, actual in zip(driver_articles, async_articles):
+        assert same_article(expected, actual)
+    # abstract of article6 is only in page loaded by moreView
+    assert async_articles[5]['abstract'].startswith('본 연구는 2000년부터')
+    assert all(article['abstract'] == article['abstract'] for article in async_articles)
@@ -0,0 +1,145 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Persistent cache of morphological analysis shared by ArticleNLP and TopicModeling.
+"""
+
+import hashlib
+import sqlite3
+import time
+import zlib
+
+SEPARATOR = '\x1f'
+
+
+def file_version(fpath, name=''):
+    """Version of tokenizer resource such as user dictionary. Hash of $name and file content.
+
+    Args:
+        fpath (str): path of resource file
+        name (str): name of tokenizer
+    Return:
+        version (str): hex digest
+    """
+    digest = hashlib.sha1(name.encode('utf-8'))
+    with open(fpath, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+class TokenCache:
+    """SQLite cache of tokenized text keyed by hash of text and tokenizer version.
+        Least recently used entries are evicted over $max_entries.
+
+    Args:
+        fpath (str): path of SQLite file
+        tokenize (callable): function of text returning list of tokens, ex) Komoran.nouns
+        version (str): version of tokenizer and user dictionary. see file_version
+        max_entries (int): maximum number of cached texts
+        tokenize_batch (callable): function of texts returning list of tokens per text, ex) BatchTokenizer.nouns_many.
+            used for texts not in cache if given
+    Return:
+    """
+    def __init__(self, fpath, tokenize, version, max_entries=200000, tokenize_batch=None):
+        self.fpath = fpath
+        self.tokenize = tokenize
+        self.tokenize_batch = tokenize_batch
+        self.version = version
+        self.max_entries = max_entries
+        self.n_hits = 0
+        self.n_misses = 0
+
+        self.connection = sqlite3.connect(fpath)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, tokens BLOB, last_used REAL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS tokens_last_used ON tokens (last_used)')
+        self.connection.commit()
+
+    def key(self, text):
+        """Cache key of text.
+
+        Args:
+            text (str): text to be tokenized
+        Return:
+            key (str): hex digest of version and text
+        """
+        return hashlib.sha1((self.version + SEPARATOR + text).encode('utf-8')).hexdigest()
+
+    def tokenize_many(self, texts):
+        """Tokenize texts. Only texts not in cache are tokenized.
+
+        Args:
+            texts (list): texts to be tokenized
+        Return:
+            tokens (list): list of tokens per text
+        """
+        keys = [self.key(text) for text in texts]
+
+        cached = dict()
+        unique_keys = list(set(keys))
+        for start in range(0, len(unique_keys), 500):
+            chunk = unique_keys[start:start + 500]
+            query = 'SELECT key, tokens FROM tokens WHERE key IN ({})'.format(','.join('?' * len(chunk)))
+            for key, blob in self.connection.execute(query, chunk):
+                data = zlib.decompress(blob).decode('utf-8')
+                cached[key] = data.split(SEPARATOR) if data else []
+
+        misses = dict()
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in misses:
+                misses[key] = text
+        self.n_hits += len(texts) - len(misses)
+        self.n_misses += len(misses)
+
+        if misses:
+            if self.tokenize_batch is not None:
+                results = self.tokenize_batch(list(misses.values()))
+            else:
+                results = [self.tokenize(text) for text in misses.values()]
+            for key, tokens in zip(misses.keys(), results):
+                cached[key] = list(tokens)
+
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO tokens (key, tokens, last_used) VALUES (?, ?, ?)',
+                [
+                    (key, zlib.compress(SEPARATOR.join(cached[key]).encode('utf-8')), now)
+                    for key in misses
+                ]
+            )
+            self.connection.executemany(
+                'UPDATE tokens SET last_used = ? WHERE key = ?', [(now, key) for key in cached if key not in misses]
+            )
+        self.evict()
+
+        return [cached[key] for key in keys]
+
+    def __call__(self, text):
+        return self.tokenize_many([text])[0]
+
+    def evict(self):
+        """Evict least recently used entries over $max_entries.
+
+        Args:
+        Return:
+            n_evicted (int): number of evicted entries
+        """
+        n_entries = self.connection.execute('SELECT COUNT(*) FROM tokens').fetchone()[0]
+        n_evicted = max(0, n_entries - self.max_entries)
+        if n_evicted > 0:
+            with self.connection:
+                self.connection.execute(
+                    'DELETE FROM tokens WHERE key IN (SELECT key FROM tokens ORDER BY last_used LIMIT ?)', (n_evicted,)
+                )
+        return n_evicted
+
+    def close(self):
+        """Close SQLite connection.
+
+        Args:
+        Return:
+        """
+        self.connection.close()
@@ -0,0 +1,303 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Batch tokenization with KoNLPy analyzers or regex noun extractor over process pool.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from token_cache import file_version
+
+HANGUL_PATTERN = re.compile(r'[가-힣]+')
+
+# particles and endings stripped from end of word, longest first
+JOSA = sorted([
+    '으로부터', '에서부터', '에게서', '으로써', '으로서', '이라는', '에서는', '에서의', '에서도', '에게는', '에서',
+    '에게', '으로', '이나', '이며', '이고', '이다', '이라', '라는', '과의', '와의', '과는', '와는', '에는', '에도',
+    '에의', '보다', '까지', '부터', '처럼', '만큼', '들이', '들을', '들의', '들은', '들과', '들에', '을', '를',
+    '이', '가', '은', '는', '의', '에', '와', '과', '도', '로', '만', '들'
+], key=len, reverse=True)
+
+# endings of predicates. word ending with these is not regarded as noun
+PREDICATE_ENDINGS = (
+    '하다', '했다', '한다', '하며', '하고', '하여', '하는', '하였', '되었', '되는', '된다', '되어', '였다', '었다',
+    '있다', '없다', '이다', '으며', '으나', '지만', '하기', '하게', '위해', '통해', '대해', '따라'
+)
+# one-syllable endings are also last syllable of many two-syllable nouns, ex) 최고, 참고, 바다,
+# so they are checked only for words of three or more syllables
+SHORT_PREDICATE_ENDINGS = ('다', '며', '고')
+
+
+class RegexNounExtractor:
+    """Rough noun extractor without morphological analysis. Hangul words are stripped of trailing particles,
+        predicates are dropped, and words of user dictionary are kept as they are. Much faster than KoNLPy, less accurate.
+
+    Args:
+        userdic (str): path of user dictionary of Komoran format (word, tag separated by tab)
+        min_length (int): minimum length of noun
+    Return:
+    """
+    def __init__(self, userdic=None, min_length=1):
+        self.min_length = min_length
+        self.userdic = set()
+        if userdic is not None and os.path.exists(userdic):
+            with open(userdic, 'r', encoding='utf-8') as f:
+                self.userdic = {line.split('\t')[0].strip() for line in f if line.strip()}
+
+    def nouns(self, text):
+        """Extract nouns of text.
+
+        Args:
+            text (str): text to be analyzed
+        Return:
+            nouns (list): nouns in order of occurrence
+        """
+        nouns = list()
+        for word in HANGUL_PATTERN.findall(text):
+            if word in self.userdic:
+                nouns.append(word)
+                continue
+            if word.endswith(PREDICATE_ENDINGS) or (len(word) >= 3 and word.endswith(SHORT_PREDICATE_ENDINGS)):
+                continue
+            for josa in JOSA:
+                # stem of one syllable is more likely a noun ending with josa, ex) 결과
+                if word.endswith(josa) and len(word) - len(josa) >= 2:
+                    word = word[:-len(josa)]
+                    break
+            if len(word) >= self.min_length:
+                nouns.append(word)
+        return nouns
+
+
+# name of backend - (name of KoNLPy class, whether user dictionary is supported). None for regex
+BACKENDS = {
+    'komoran': ('Komoran', True),
+    'okt': ('Okt', False),
+    'hannanum': ('Hannanum', False),
+    'kkma': ('Kkma', False),
+    'mecab': ('Mecab', False),
+    'regex': (None, True)
+}
+
+
+def create_analyzer(backend, userdic=None):
+    """Create analyzer of backend. Every analyzer has nouns(text).
+
+    Args:
+        backend (str): name of backend. key of BACKENDS
+        userdic (str): path of user dictionary. ignored if backend does not support it
+    Return:
+        analyzer (object): analyzer of backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError('unknown backend: {}'.format(backend))
+    name, supports_userdic = BACKENDS[backend]
+    if name is None:
+        return RegexNounExtractor(userdic)
+
+    # konlpy pulls in jpype on import, so it is deferred until analyzer is needed
+    from konlpy import tag
+    if supports_userdic and userdic is not None:
+        return getattr(tag, name)(userdic=userdic)
+    return getattr(tag, name)()
+
+
+# analyzer of worker process. created once per worker by _init_worker
+_analyzer = None
+
+
+def _init_worker(backend, userdic):
+    global _analyzer
+    _analyzer = create_analyzer(backend, userdic)
+
+
+def _nouns_chunk(texts):
+    return [_analyzer.nouns(text) for text in texts]
+
+
+class BatchTokenizer:
+    """Extract nouns in parallel. Each worker process starts its own analyzer(and JVM for KoNLPy) and loads user dictionary once.
+        Texts are dispatched in chunks to amortize inter-process communication, and results keep input order.
+
+    Args:
+        userdic (str): path of user dictionary
+        n_workers (int): number of worker processes. tokenize in this process if 1. Default number of cores.
+        chunksize (int): number of texts per dispatch
+        backend (str): name of analyzer. key of BACKENDS
+    Return:
+    """
+    def __init__(self, userdic, n_workers=None, chunksize=32, backend='komoran'):
+        if backend not in BACKENDS:
+            raise ValueError('unknown backend: {}'.format(backend))
+        self.userdic = userdic
+        self.n_workers = n_workers if n_workers is not None else os.cpu_count()
+        self.chunksize = chunksize
+        self.backend = backend
+
+        self.analyzer = None
+        self.executor = None
+
+    def version(self):
+        """Version of backend and user dictionary for TokenCache.
+
+        Args:
+        Return:
+            version (str): hex digest
+        """
+        # 'Komoran' is kept as name of komoran backend so that existing cache stays valid
+        name = 'Komoran' if self.backend == 'komoran' else self.backend
+        if self.userdic is None or not os.path.exists(self.userdic):
+            return hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return file_version(self.userdic, name)
+
+    def nouns(self, text):
+        """Extract nouns of text in this process.
+
+        Args:
+            text (str): text to be analyzed
+        Return:
+            nouns (list): nouns
+        """
+        if self.analyzer is None:
+            self.analyzer = create_analyzer(self.backend, self.userdic)
+        return self.analyzer.nouns(text)
+
+    def nouns_many(self, texts):
+        """Extract nouns of texts over worker processes.
+
+        Args:
+            texts (list): texts to be analyzed
+        Return:
+            nouns (list): list of nouns per text in the order of $texts
+        """
+        texts = list(texts)
+        if self.n_workers <= 1 or len(texts) <= self.chunksize:
+            return [self.nouns(text) for text in texts]
+
+        if self.executor is None:
+            # JVM does not survive fork, so workers are spawned
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.backend, self.userdic)
+            )
+
+        chunks = [texts[start:start + self.chunksize] for start in range(0, len(texts), self.chunksize)]
+        nouns = list()
+        for chunk_nouns in self.executor.map(_nouns_chunk, chunks):
+            nouns += chunk_nouns
+        return nouns
+
+    def close(self):
+        """Shut down worker processes.
+
+        Args:
+        Return:
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def benchmark(texts, userdic, worker_counts=None, chunksize=32):
+    """Measure throughput of BatchTokenizer per number of workers. JVM start-up is excluded by warming up workers.
+
+    Args:
+        texts (list): texts to be analyzed
+        userdic (str): path of user dictionary
+        worker_counts (list): numbers of workers to be measured. Default 1, 2, 4, ... up to number of cores
+        chunksize (int): number of texts per dispatch
+    Return:
+        texts_per_sec (dict): number of workers - texts per second
+    """
+    if worker_counts is None:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= os.cpu_count():
+            worker_counts.append(worker_counts[-1] * 2)
+
+    texts_per_sec = dict()
+    for n_workers in worker_counts:
+        tokenizer = BatchTokenizer(userdic, n_workers, chunksize)
+        tokenizer.nouns_many(texts[:chunksize * n_workers + 1])
+
+        start = time.perf_counter()
+        tokenizer.nouns_many(texts)
+        texts_per_sec[n_workers] = len(texts) / (time.perf_counter() - start)
+        tokenizer.close()
+    return texts_per_sec
+
+
+def compare_backends(texts, userdic, backends=None, reference='komoran'):
+    """Measure speed of backends in single process and agreement of their noun sets with $reference.
+        Agreement is mean jaccard similarity of noun set per text. Start-up of analyzer is excluded.
+
+    Args:
+        texts (list): texts to be analyzed
+        userdic (str): path of user dictionary
+        backends (list): names of backends. Default all backends
+        reference (str): backend regarded as correct
+    Return:
+        results (dict): backend - dict of texts_per_sec, tokens_per_sec and agreement. None if backend is not available
+    """
+    backends = list(BACKENDS) if backends is None else list(backends)
+    if reference in backends:
+        backends.remove(reference)
+    backends.insert(0, reference)
+
+    results = dict()
+    reference_nouns = None
+    for backend in backends:
+        tokenizer = BatchTokenizer(userdic, n_workers=1, backend=backend)
+        try:
+            tokenizer.nouns(texts[0] if texts else '')
+        except Exception as e:
+            print('{} is not available: {}'.format(backend, e))
+            results[backend] = None
+            continue
+
+        start = time.perf_counter()
+        nouns = [tokenizer.nouns(text) for text in texts]
+        elapsed = time.perf_counter() - start
+
+        if backend == reference:
+            reference_nouns = nouns
+        agreement = list()
+        for mine, theirs in zip(nouns, reference_nouns or []):
+            mine, theirs = set(mine), set(theirs)
+            agreement.append(len(mine & theirs) / len(mine | theirs) if mine | theirs else 1.0)
+
+        results[backend] = {
+            'texts_per_sec': len(texts) / elapsed if elapsed > 0 else 0.0,
+            'tokens_per_sec': sum(len(n) for n in nouns) / elapsed if elapsed > 0 else 0.0,
+            'agreement': sum(agreement) / len(agreement) if agreement else None
+        }
+    return results
+
+
+if __name__ == '__main__':
+    # $ python tokenizer.py [dataset] [workers|backends]
+    from storage import load_dataframe
+
+    dataframe = load_dataframe(sys.argv[1] if len(sys.argv) > 1 else './data/keyword-abstract.parquet', columns=['abstract'])
+    texts = list(dataframe.abstract)
+
+    if len(sys.argv) > 2 and sys.argv[2] == 'backends':
+        results = compare_backends(texts, './data/user_dic.tsv')
+        for backend, result in results.items():
+            if result is not None:
+                print('{:10s} {:10.1f} abstracts/sec {:12.1f} nouns/sec  agreement {}'.format(
+                    backend, result['texts_per_sec'], result['tokens_per_sec'],
+                    '-' if result['agreement'] is None else '{:.3f}'.format(result['agreement'])
+                ))
+    else:
+        texts_per_sec = benchmark(texts, './data/user_dic.tsv')
+        for n_workers, speed in texts_per_sec.items():
+            print('{:3d} workers {:10.1f} abstracts/sec  x{:.2f}'.format(n_workers, speed, speed / texts_per_sec[1]))
@@ -5,45 +5,161 @@ Date: 2020-06-26 (Last Modified)
 Objective: EDA. 
 """
 
-import pandas as pd
-from konlpy.tag import Komoran
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
-import pyLDAvis
-from pyLDAvis.sklearn import prepare
+import os
+import sys
+
+import numpy as np
+
+from corpus import CorpusVectorizer, cached_corpus
+from model_registry import ModelRegistry, model_key
+from online_lda import OnlineTopicModel
+from startup import StartupReport
+from storage import load_dataframe
+from term_index import fingerprint
+from term_stats import document_keys
+from topic_sweep import sweep
+from token_cache import TokenCache
+from tokenizer import BatchTokenizer
 
 class TopicModeling:
     """Topic Modeling with Visualization.
 
     Args:
         fpath (str): path to load dataset
+        backend (str): tokenizer of abstract. see tokenizer.BACKENDS
     Return:
     """
-    def __init__(self, fpath):
-        self.dataframe = pd.read_csv(fpath, encoding='utf-8')  
-        self.komoran = Komoran(userdic='./data/user_dic.tsv')
+    def __init__(self, fpath, backend='komoran'):
+        self.backend = backend
+        self.report = StartupReport('TopicModeling')
+        with self.report.measure('dataframe'):
+            self.dataframe = load_dataframe(fpath, columns=['title', 'abstract'])
+        self._tokenizer = None
+        self._token_cache = None
+        self._corpus = None
+        self.registry = ModelRegistry('./data/models')
 
-    def topic_modeling(self, n):
-        """Topic Modeling using LDA in scikit-learn.
+    @property
+    def tokenizer(self):
+        """Tokenizer of $backend created on first access. JVM starts on first text."""
+        if self._tokenizer is None:
+            with self.report.measure('tokenizer'):
+                self._tokenizer = BatchTokenizer('./data/user_dic.tsv', backend=self.backend)
+        return self._tokenizer
+
+    @property
+    def token_cache(self):
+        """Token cache opened on first access."""
+        if self._token_cache is None:
+            with self.report.measure('token_cache'):
+                self._token_cache = TokenCache(
+                    './data/token_cache.sqlite', self.tokenizer.nouns, self.tokenizer.version(),
+                    tokenize_batch=self.tokenizer.nouns_many
+                )
+        return self._token_cache
+
+    def corpus(self):
+        """Nouns of abstracts as memory-mapped token ids. Rebuilt only if dataset or tokenizer is changed.
+
+        Args:
+        Return:
+            corpus (TokenCorpus): corpus of abstract nouns
+        """
+        if self._corpus is None:
+            version = fingerprint([self.token_cache.version], self.dataframe.abstract)
+            self._corpus = cached_corpus(
+                './data/corpus-{}'.format(self.backend), version,
+                lambda: self.token_cache.tokenize_many(list(self.dataframe.abstract))
+            )
+        return self._corpus
+
+    def trained_model(self, n):
+        """Topic Modeling using LDA in scikit-learn. Fitted models are reloaded from registry
+            if dataset, tokenizer, user dictionary and hyperparameters are unchanged.
 
         Args:
             n (int): number of topic
         Return:
+            tfidf (CorpusVectorizer): fitted vectorizer
+            lda (LatentDirichletAllocation): fitted LDA
+            doc2vec (scipy csr_matrix): tf-idf of abstracts
+            doc_topic (numpy array): topic distribution of abstracts
         """
-        corpus = list()
-        for idx in range(len(self.dataframe)):
-            abstract = self.dataframe.loc[idx, 'abstract']
-            nouns = [noun for noun in self.komoran.nouns(abstract) if len(noun) > 1]
-            corpus.append(' '.join(nouns))
+        params = {'vectorizer': 'tfidf', 'min_df': 10, 'min_length': 2, 'n_components': n, 'random_state': 2020}
+        corpus = self.corpus()
+        key = model_key(corpus.version, params)
+        if key in self.registry:
+            with self.report.measure('registry'):
+                return self.registry.load(key)
 
-        tfidf = TfidfVectorizer(lowercase=False, min_df=10)
+        with self.report.measure('sklearn'):
+            from sklearn.decomposition import LatentDirichletAllocation
+
+        # same features and weights as TfidfVectorizer(lowercase=False, min_df=10) over nouns longer than 1
+        tfidf = CorpusVectorizer(min_df=params['min_df'], min_length=params['min_length'])
         doc2vec = tfidf.fit_transform(corpus)
 
-        lda = LatentDirichletAllocation(n_components=n, verbose=True, random_state=2020)
-        lda.fit(doc2vec)
+        lda = LatentDirichletAllocation(n_components=n, verbose=True, random_state=params['random_state'])
+        doc_topic = lda.fit_transform(doc2vec)
+
+        self.registry.save(key, tfidf, lda, doc2vec, doc_topic, params)
+        return tfidf, lda, doc2vec, doc_topic
 
+    def topic_modeling(self, n):
+        """Topic Modeling using LDA in scikit-learn.
+
+        Args:
+            n (int): number of topic
+        Return:
+            lda (LatentDirichletAllocation): fitted LDA
+            doc2vec (scipy csr_matrix): tf-idf of abstracts
+            tfidf (CorpusVectorizer): fitted vectorizer
+        """
+        tfidf, lda, doc2vec, _ = self.trained_model(n)
         return lda, doc2vec, tfidf
 
+    def sweep(self, n_components_list, seeds=(2020,), n_workers=None, max_iter=10):
+        """Fit LDA for every number of topic and seed in parallel to choose number of topic.
+            TF-IDF matrix is built once and shared read-only by workers.
+
+        Args:
+            n_components_list (list): numbers of topic
+            seeds (list): random states
+            n_workers (int): number of worker processes. Default number of cores.
+            max_iter (int): maximum number of iterations per fit
+        Return:
+            results (pandas DataFrame): perplexity, log_likelihood, coherence and seconds per number of topic and seed
+        """
+        tfidf = CorpusVectorizer(min_df=10, min_length=2)
+        doc2vec = tfidf.fit_transform(self.corpus())
+        return sweep(doc2vec, n_components_list, seeds, n_workers, max_iter)
+
+    def online_topic_modeling(self, n, batch_size=256, checkpoint_fpath=None, vocabulary=None, verbose=False):
+        """Topic Modeling using online LDA. Model is resumed from checkpoint and only new abstracts are learned.
+
+        Args:
+            n (int): number of topic
+            batch_size (int): number of abstracts per mini-batch
+            checkpoint_fpath (str): path of checkpoint. Default ./data/lda-online-$backend-$n.pkl
+            vocabulary (list): fixed vocabulary. hashed vocabulary if None
+            verbose (bool): whether to print progress per mini-batch
+        Return:
+            model (OnlineTopicModel): updated model. ValueError if $n, $vocabulary or $batch_size differ from checkpoint
+        """
+        if checkpoint_fpath is None:
+            checkpoint_fpath = './data/lda-online-{}-{}.pkl'.format(self.backend, n)
+        if os.path.exists(checkpoint_fpath):
+            model = OnlineTopicModel.load(checkpoint_fpath)
+            model.check(n, vocabulary=vocabulary, batch_size=batch_size)
+        else:
+            model = OnlineTopicModel(n, vocabulary=vocabulary, batch_size=batch_size)
+
+        # identical abstracts, ex) empty ones, are different articles
+        keys = document_keys(self.dataframe.title, self.dataframe.abstract)
+        n_learned = model.partial_fit(self.corpus(), keys, checkpoint_fpath=checkpoint_fpath, verbose=verbose)
+        print('{} abstracts are newly learned, {} in total'.format(n_learned, len(model.seen)))
+        return model
+
     def visualize_lda(self, n):
         """Visualizing Topic Modeling using pyLDAvis.
 
@@ -51,14 +167,32 @@ class TopicModeling:
             n (int): number of topic
         Return:
         """
-        lda, doc2vec, tfidf = self.topic_modeling(n)
-        prepared = prepare(lda, doc2vec, tfidf)  
+        with self.report.measure('pyLDAvis'):
+            import pyLDAvis
+
+        # same as pyLDAvis.sklearn.prepare, with stored doc-topic matrix instead of transforming again
+        tfidf, lda, doc2vec, doc_topic = self.trained_model(n)
+        prepared = pyLDAvis.prepare(
+            lda.components_ / lda.components_.sum(axis=1)[:, None],
+            doc_topic / doc_topic.sum(axis=1)[:, None],
+            np.asarray(doc2vec.sum(axis=1)).ravel(),
+            tfidf.get_feature_names(),
+            np.asarray(doc2vec.sum(axis=0)).ravel()
+        )
         pyLDAvis.save_html(prepared, './figure/topic_modeling.html')
 
 
 if __name__ == '__main__':
-    modeling = TopicModeling(fpath='./data/keyword-abstract.csv')
-    modeling.visualize_lda(11)
+    # $ python topic_modeling.py [online|sweep]
+    modeling = TopicModeling(fpath='./data/keyword-abstract.parquet')
+    if len(sys.argv) > 1 and sys.argv[1] == 'online':
+        modeling.online_topic_modeling(11, verbose=True)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        results = modeling.sweep(range(5, 21), seeds=[2020, 2021, 2022])
+        print(results.groupby('n_components')[['perplexity', 'log_likelihood', 'coherence', 'seconds']].mean())
+    else:
+        modeling.visualize_lda(11)
+    modeling.report.report()
                 
 
 
@@ -0,0 +1,115 @@
+#-*- coding: utf-8 -*-
+"""
+Author: DHSong
+Date: 2020-06-26 (Last Modified)
+Objective: Parallel sweep of number of topics and seeds of LDA with model selection metrics.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def umass_coherence(matrix, components, top_n=10):
+    """UMass coherence of topics from document co-occurrence of their top words. Higher is better.
+
+    Args:
+        matrix (scipy sparse matrix): n_docs x n_features doc-term matrix
+        components (numpy array): n_topics x n_features topic-word weights
+        top_n (int): number of top words per topic
+    Return:
+        coherence (float): mean coherence over topics
+    """
+    binary = sparse.csc_matrix(matrix, copy=True)
+    binary.data[:] = 1
+
+    scores = list()
+    for topic in components:
+        top = np.argsort(-topic)[:top_n]
+        columns = binary[:, top]
+        cooccurrence = (columns.T @ columns).toarray()
+        score = 0.0
+        for i in range(1, len(top)):
+            for j in range(i):
+                # D(w_j) > 0 since top words of fitted topic occur in corpus. guarded for empty columns
+                score += np.log((cooccurrence[i, j] + 1) / max(cooccurrence[j, j], 1))
+        scores.append(score)
+    return float(np.mean(scores))
+
+
+# doc-term matrix of worker process. memory-mapped once per worker by _init_worker
+_matrix = None
+
+
+def _init_worker(dpath):
+    global _matrix
+    arrays = [np.load(os.path.join(dpath, name + '.npy'), mmap_mode='r') for name in ['data', 'indices', 'indptr', 'shape']]
+    _matrix = sparse.csr_matrix((arrays[0], arrays[1], arrays[2]), shape=tuple(arrays[3]), copy=False)
+
+
+def _fit(n_components, seed, max_iter, top_n):
+    from sklearn.decomposition import LatentDirichletAllocation
+
+    start = time.perf_counter()
+    lda = LatentDirichletAllocation(n_components=n_components, max_iter=max_iter, random_state=seed)
+    lda.fit(_matrix)
+    seconds = time.perf_counter() - start
+
+    return {
+        'n_components': n_components,
+        'seed': seed,
+        'perplexity': lda.perplexity(_matrix),
+        'log_likelihood': lda.score(_matrix),
+        'coherence': umass_coherence(_matrix, lda.components_, top_n),
+        'seconds': seconds
+    }
+
+
+def sweep(matrix, n_components_list, seeds=(2020,), n_workers=None, max_iter=10, top_n=10, verbose=True):
+    """Fit LDA for every number of topics and seed over worker processes.
+        Doc-term matrix is written once to temporary .npy files and memory-mapped read-only by every worker.
+
+    Args:
+        matrix (scipy sparse matrix): n_docs x n_features doc-term matrix
+        n_components_list (list): numbers of topics
+        seeds (list): random states
+        n_workers (int): number of worker processes. Default number of cores.
+        max_iter (int): maximum number of iterations per fit
+        top_n (int): number of top words per topic for coherence
+        verbose (bool): whether to print each result when finished
+    Return:
+        results (pandas DataFrame): n_components, seed, perplexity, log_likelihood, coherence and seconds per fit
+    """
+    matrix = sparse.csr_matrix(matrix)
+    n_workers = n_workers if n_workers is not None else os.cpu_count()
+    settings = [(n, seed) for n in n_components_list for seed in seeds]
+
+    dpath = tempfile.mkdtemp(prefix='lda-sweep-')
+    try:
+        for name, array in [('data', matrix.data), ('indices', matrix.indices), ('indptr', matrix.indptr),
+                            ('shape', np.array(matrix.shape))]:
+            np.save(os.path.join(dpath, name + '.npy'), array)
+
+        results = list()
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(settings)), mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(dpath,)
+        ) as executor:
+            futures = [executor.submit(_fit, n, seed, max_iter, top_n) for n, seed in settings]
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                if verbose:
+                    print('{n_components:3d} topics seed {seed:5d}: perplexity {perplexity:10.2f} '
+                          'log-likelihood {log_likelihood:12.2f} coherence {coherence:8.3f} {seconds:7.2f}s'.format(**result))
+    finally:
+        shutil.rmtree(dpath)
+
+    return pd.DataFrame(results).sort_values(['n_components', 'seed']).reset_index(drop=True)